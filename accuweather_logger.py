@@ -3,20 +3,43 @@
 # Columns: timestamp,target_date,forecast_or_actual,forecast_time,predicted_high,
 #          forecast_detail,cli_date,actual_high,high_time,bias_corrected_prediction,source
 
-import os, sys, csv, datetime, argparse
+import os, sys, io, csv, json, time, datetime, argparse
+from collections import namedtuple
+from zoneinfo import ZoneInfo
+
 import requests
-import pytz
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from city_config import get_city_config, DEFAULT_CITY
 
+# orjson parses bytes directly and is much faster on the nested 5-day JSON;
+# it isn't in every workflow's pip line, so stdlib json stays the fallback.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 # ===== City config via --city arg =====
 _parser = argparse.ArgumentParser()
 _parser.add_argument("--city", default=os.environ.get("CITY", DEFAULT_CITY),
                      help="City key (nyc, lax, etc.)")
+_parser.add_argument("--frequent", action="store_true",
+                     help="10-minute polling mode (forecast-frequent.yml): D0 from the 1-day "
+                          "endpoint, log whenever a day's value differs from its last row, "
+                          "freeze today via HAS_ACTUAL_TODAY")
 _args, _ = _parser.parse_known_args()
 _CFG = get_city_config(_args.city)
 
-CSV_PATH = _CFG["accu_csv"]
+# --frequent: the NYC polling workflow's behaviour. It tracks every change
+# (a flip back to an earlier value is logged again) and freezes today once
+# the NWS CLI actual exists, which the workflow passes in as HAS_ACTUAL_TODAY.
+FREQUENT = _args.frequent
+HAS_ACTUAL_TODAY = os.environ.get("HAS_ACTUAL_TODAY", "false").lower() == "true"
+
+# ACCU_CSV_PATH points a run at a scratch log without touching city_config.
+CSV_PATH = os.environ.get("ACCU_CSV_PATH", _CFG["accu_csv"])
 print(f"[Accu logger] city={_args.city} CSV_PATH={CSV_PATH}", file=sys.stderr)
 
 ACCU_API_KEY = os.environ.get("ACCU_API_KEY")
@@ -27,7 +50,7 @@ if not ACCU_API_KEY or not ACCU_LOCATION_KEY:
     print(f"accuweather_logger: Missing ACCU_API_KEY or {_CFG['accu_location_key_env']} env vars", file=sys.stderr)
     sys.exit(0)  # don't fail the workflow; just skip
 
-tz = pytz.timezone(TZ_NAME)
+tz = ZoneInfo(TZ_NAME)
 
 # ===== MIDNIGHT-4AM FREEZE CHECK (in city's local time) =====
 local_now = datetime.datetime.now(tz)
@@ -43,133 +66,206 @@ if 0 <= local_hour < 4:
 def now_local():
     return datetime.datetime.now(tz)
 
-def iso_date(dt):
-    return dt.strftime("%Y-%m-%d")
-
 def stamp(dt):
-    return dt.strftime("%Y-%m-%d %H:%M:%S")
+    return dt.strftime("%Y-%m-%d %H:%M:%S %Z" if FREQUENT else "%Y-%m-%d %H:%M:%S")
 
 def is_after_6pm_local(dt):
     return dt.hour >= 18
 
-def actual_already_logged(csv_path, target_iso):
+LOG_HEADER = [
+    "timestamp","target_date","forecast_or_actual","forecast_time",
+    "predicted_high","forecast_detail","cli_date","actual_high",
+    "high_time","bias_corrected_prediction","source"
+]
+
+LogCols = namedtuple("LogCols", "target kind pred source")
+
+def _col_indices(header):
+    """Positions of the dedupe columns, falling back to the LOG_HEADER layout."""
+    col = {name: i for i, name in enumerate(header)}
+    return LogCols(*(
+        col.get(name, LOG_HEADER.index(name))
+        for name in ("target_date", "forecast_or_actual", "predicted_high", "source")
+    ))
+
+# Dedupe only ever looks at today/tomorrow, and the log is appended in time
+# order, so those rows always sit in the last few KB of the file.
+TAIL_BYTES = 65536
+
+def tail_rows(csv_path, max_bytes=TAIL_BYTES):
+    """
+    Yield the header row, then the rows in the last `max_bytes` of the file
+    (the whole file when it is smaller than that).
+    """
+    with open(csv_path, "rb") as fb:
+        header_line = fb.readline()
+        size = os.fstat(fb.fileno()).st_size
+        if size > max_bytes:
+            fb.seek(size - max_bytes)
+            fb.readline()  # drop the partial line we landed in
+        yield next(csv.reader([header_line.decode("utf-8")]), [])
+        yield from csv.reader(io.TextIOWrapper(fb, encoding="utf-8", newline=""))
+
+def scan_log(csv_path, dates, source="AccuWeather"):
+    """
+    Dedupe summary for today/tomorrow-style `dates` from the tail of the log.
+    Only the last TAIL_BYTES are read, and the backwards walk stops at the
+    first row targeting two days before the earliest wanted date, so older
+    dates come back as empty info even when the log has rows for them.
+    Returns {date: {"actual": bool, "highs": set of predicted_high ints for source,
+                    "last": the most recently logged of those, or None}}.
+    """
+    wanted = frozenset(dates)
+    info = {d: {"actual": False, "highs": set(), "last": None} for d in wanted}
+    # First run / empty file: nothing logged yet, don't bother opening it.
     try:
-        with open(csv_path, newline="", encoding="utf-8") as f:
-            r = csv.DictReader(f)
-            for row in r:
-                if row.get("target_date") == target_iso and row.get("forecast_or_actual") == "actual":
-                    return True
+        st = os.stat(csv_path)
     except FileNotFoundError:
-        return False
-    return False
+        return info
+    if st.st_size < 2:
+        return info
 
-def existing_highs(csv_path, target_iso, source="AccuWeather"):
-    """Return set of predicted_high values already logged for this target_date/source."""
-    highs = set()
+    # Rows for date D are logged on D-1 (as D1) and D (as D0), and the log is
+    # chronological, so walking backwards we can stop at the first row whose
+    # target is two days before the earliest wanted date.
     try:
-        with open(csv_path, newline="", encoding="utf-8") as f:
-            r = csv.DictReader(f)
-            for row in r:
-                if (
-                    (row.get("target_date") or "").strip() == target_iso
-                    and (row.get("forecast_or_actual") or "").lower() == "forecast"
-                    and (row.get("source") or "") == source
-                ):
-                    ph = (row.get("predicted_high") or "").strip()
-                    if ph != "":
-                        try:
-                            highs.add(int(ph))
-                        except Exception:
-                            pass
-    except FileNotFoundError:
-        return highs
-    return highs
+        floor = (datetime.date.fromisoformat(min(info)) - datetime.timedelta(days=2)).isoformat()
+    except ValueError:
+        floor = ""
 
-def fetch_accuweather():
-    url = f"http://dataservice.accuweather.com/forecasts/v1/daily/5day/{ACCU_LOCATION_KEY}?apikey={ACCU_API_KEY}&details=true&metric=false"
-    resp = requests.get(url, timeout=15)
+    r = tail_rows(csv_path)
+    i_target, i_kind, i_pred, i_source = _col_indices(next(r, None) or [])
+    for row in reversed(list(r)):
+        if len(row) <= i_kind:
+            continue
+        td = row[i_target].strip()
+        if td and td <= floor:
+            break
+        entry = info.get(td)
+        if entry is None:
+            continue
+        kind = row[i_kind].lower()
+        if kind == "actual":
+            entry["actual"] = True
+        elif kind == "forecast" and len(row) > i_source and row[i_source] == source:
+            ph = row[i_pred].strip() if len(row) > i_pred else ""
+            if ph != "":
+                try:
+                    high = int(ph)
+                except Exception:
+                    continue
+                entry["highs"].add(high)
+                if entry["last"] is None:  # walking backwards: first seen is newest
+                    entry["last"] = high
+    return info
+
+# One pooled keep-alive session for all AccuWeather calls; retries transient
+# 429/5xx instead of burning the run on a single blip.
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=2, pool_maxsize=2,
+    max_retries=Retry(total=2, backoff_factor=0.3,
+                      status_forcelist=[429, 500, 502, 503, 504]),
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+def fetch_accuweather(span="5day", fresh=False):
+    """One daily-forecast product; `fresh` adds cache-busting for frequent polling."""
+    url = f"http://dataservice.accuweather.com/forecasts/v1/daily/{span}/{ACCU_LOCATION_KEY}?apikey={ACCU_API_KEY}&details=true&metric=false"
+    headers = None
+    if fresh:
+        url += f"&_ts={int(time.time())}"
+        headers = {"Cache-Control": "no-cache", "Pragma": "no-cache"}
+    resp = _SESSION.get(url, headers=headers, timeout=(3, 10))
     resp.raise_for_status()
-    return resp.json()
+    return _loads(resp.content)
 
-def row_for(day_obj, offset):
-    target_dt = now_local().date() + datetime.timedelta(days=offset)
-    target_str = target_dt.strftime("%Y-%m-%d")
-    fc_time = now_local().strftime("%Y-%m-%d %H:%M:%S")
-    max_f = day_obj.get("Temperature", {}).get("Maximum", {}).get("Value")
+def _fetch_day_or_none(span, index, label):
+    """DailyForecasts[index] of `span`, or None (logged) if the fetch fails."""
     try:
-        max_f = int(round(float(max_f)))
+        return fetch_accuweather(span, fresh=True).get("DailyForecasts", [])[index]
+    except Exception as e:
+        print(f"[Accu] {label} fetch failed: {e}", file=sys.stderr)
+        return None
+
+def _to_int_temp(v):
+    """int(round(float(v))) with a fast path for the JSON int/float case; "" if unusable."""
+    if type(v) is int:
+        return v
+    try:
+        # round() on a float already returns an int (same half-to-even rule)
+        return round(v) if type(v) is float else int(round(float(v)))
     except Exception:
-        max_f = ""
-    detail = day_obj.get("Day", {}).get("IconPhrase", "")
+        return ""
+
+def parse_day(day_obj):
+    """(max_f int or "", detail) for one DailyForecasts entry."""
+    max_f = _to_int_temp(day_obj.get("Temperature", {}).get("Maximum", {}).get("Value"))
+    return max_f, day_obj.get("Day", {}).get("IconPhrase", "")
+
+def row_for(max_f, detail, target_str, ts):
+    """One forecast row; `target_str` and `ts` are formatted once by the caller."""
     return [
-        stamp(now_local()),
+        ts,
         target_str,
         "forecast",
-        fc_time,
+        ts,
         max_f,
-        detail,
+        f"Accu: {detail}" if FREQUENT else detail,
         "", "", "", "",
         "AccuWeather",
     ]
 
+def _is_new(max_f, entry):
+    """Default: a high not yet logged for the day. --frequent: differs from the last one."""
+    if max_f == "":
+        return False
+    return max_f != entry["last"] if FREQUENT else max_f not in entry["highs"]
+
 def rows_for_today_and_tomorrow():
     now = now_local()
-    daily = fetch_accuweather().get("DailyForecasts", [])
+    ts = stamp(now)
     rows = []
 
-    # --- D0 (today) ---
-    today_str = iso_date(now)
-    max_f_today = daily[0].get("Temperature", {}).get("Maximum", {}).get("Value")
-    try:
-        max_f_today = int(round(float(max_f_today)))
-    except Exception:
-        max_f_today = ""
-
-    already_highs_today = existing_highs(CSV_PATH, today_str, "AccuWeather")
-
-    if (
-        not is_after_6pm_local(now)
-        and not actual_already_logged(CSV_PATH, today_str)
-        and max_f_today != ""
-        and max_f_today not in already_highs_today
-    ):
-        print(f"Appending new D0 forecast {max_f_today} for {today_str}")
-        rows.append(row_for(daily[0], 0))
-    else:
-        print(f"Skipped D0 {today_str}, max={max_f_today}, already={already_highs_today}")
-
-    # --- D1 (tomorrow) ---
-    tomorrow_str = iso_date(now + datetime.timedelta(days=1))
-    max_f_tomorrow = daily[1].get("Temperature", {}).get("Maximum", {}).get("Value")
-    try:
-        max_f_tomorrow = int(round(float(max_f_tomorrow)))
-    except Exception:
-        max_f_tomorrow = ""
+    today_date = now.date()
+    today_str = today_date.isoformat()
+    tomorrow_str = (today_date + datetime.timedelta(days=1)).isoformat()
 
-    already_highs_tomorrow = existing_highs(CSV_PATH, tomorrow_str, "AccuWeather")
+    info = scan_log(CSV_PATH, {today_str, tomorrow_str}, "AccuWeather")
 
-    if max_f_tomorrow != "" and max_f_tomorrow not in already_highs_tomorrow:
-        print(f"Appending new D1 forecast {max_f_tomorrow} for {tomorrow_str}")
-        rows.append(row_for(daily[1], 1))
+    if FREQUENT:
+        freeze_today = HAS_ACTUAL_TODAY
+        day_today = None if freeze_today else _fetch_day_or_none("1day", 0, "D0")
+        day_tomorrow = _fetch_day_or_none("5day", 1, "D1")
     else:
-        print(f"Skipped D1 {tomorrow_str}, max={max_f_tomorrow}, already={already_highs_tomorrow}")
+        freeze_today = is_after_6pm_local(now) or info[today_str]["actual"]
+        daily = fetch_accuweather().get("DailyForecasts", [])
+        day_today, day_tomorrow = daily[0], daily[1]
+
+    for label, day, target_str, frozen in (("D0", day_today, today_str, freeze_today),
+                                           ("D1", day_tomorrow, tomorrow_str, False)):
+        max_f, detail = parse_day(day) if day is not None else ("", "")
+        entry = info[target_str]
+        if not frozen and _is_new(max_f, entry):
+            print(f"Appending new {label} forecast {max_f} for {target_str}")
+            rows.append(row_for(max_f, detail, target_str, ts))
+        else:
+            already = entry["last"] if FREQUENT else entry["highs"]
+            print(f"Skipped {label} {target_str}, max={max_f}, already={already}")
 
     return rows
 
 def append_rows(csv_path, rows):
     if not rows:
         return
-    header = [
-        "timestamp","target_date","forecast_or_actual","forecast_time",
-        "predicted_high","forecast_detail","cli_date","actual_high",
-        "high_time","bias_corrected_prediction","source"
-    ]
-    file_exists = os.path.exists(csv_path)
-    with open(csv_path, "a", newline="", encoding="utf-8") as f:
+    # One open: "a+" creates the file if needed, and an empty file (new or
+    # truncated) gets the header in the same write as the rows.
+    with open(csv_path, "a+", newline="", encoding="utf-8") as f:
+        f.seek(0, os.SEEK_END)
+        empty = f.tell() == 0
         w = csv.writer(f)
-        if not file_exists:
-            w.writerow(header)
-        w.writerows(rows)
+        w.writerows(([LOG_HEADER] if empty else []) + rows)
 
 def main():
     rows = rows_for_today_and_tomorrow()
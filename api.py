@@ -1,12 +1,26 @@
 # api.py
+import heapq
 import json
+import os
 import pickle
+import queue
+import threading
+import time
+import warnings
 
 import numpy as np
-import pandas as pd
+import sklearn
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from datetime import datetime
 
+# orjson is several times faster than stdlib json for the response bodies;
+# stdlib json (Flask's default provider) stays the fallback.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from model_config import FEATURE_COLS, ACCU_NWS_FALLBACK, derive_bucket_probabilities
 
 # Load models once at startup
@@ -22,6 +36,20 @@ else:
     RESIDUAL_STD = 2.0  # fallback for old-style classifier
 
 
+# Use model's own feature list when available (self-consistent with training)
+MODEL_COLS = FEATURE_COLS
+if hasattr(TEMP_MODEL, "feature_names_in_"):
+    MODEL_COLS = list(TEMP_MODEL.feature_names_in_)
+_ACCU_NWS_FALLBACK_IDX = [
+    (MODEL_COLS.index(accu_col), MODEL_COLS.index(nws_col))
+    for accu_col, nws_col in ACCU_NWS_FALLBACK.items()
+    if accu_col in MODEL_COLS and nws_col in MODEL_COLS
+]
+
+_SUMMER_MONTHS = frozenset((6, 7, 8))
+_WINTER_MONTHS = frozenset((12, 1, 2))
+
+
 def prepare_features(raw):
     m = int(raw.get("month", 1))
 
@@ -68,8 +96,8 @@ def prepare_features(raw):
         "day_of_year_sin": np.sin(2 * np.pi * doy / 365),
         "day_of_year_cos": np.cos(2 * np.pi * doy / 365),
         "month": m,
-        "is_summer": int(m in [6, 7, 8]),
-        "is_winter": int(m in [12, 1, 2]),
+        "is_summer": int(m in _SUMMER_MONTHS),
+        "is_winter": int(m in _WINTER_MONTHS),
 
         # Rolling bias (must be provided by caller or default to 0)
         "rolling_bias_7d": float(raw.get("rolling_bias_7d", 0)),
@@ -81,24 +109,237 @@ def prepare_features(raw):
         "has_accu_data": int(raw.get("has_accu_data", int(raw.get("accu_last") is not None))),
     }
 
-    # Use model's own feature list when available (self-consistent with training)
-    _cols = FEATURE_COLS
-    if hasattr(TEMP_MODEL, "feature_names_in_"):
-        _cols = list(TEMP_MODEL.feature_names_in_)
-    for col in _cols:
-        if col not in row:
-            row[col] = np.nan
-    X = pd.DataFrame([row], columns=_cols)
+    # Plain (1, n_features) float array in the model's column order — sklearn
+    # converts a DataFrame to exactly this anyway, minus the pandas overhead.
+    # Kept float64: the trees' split thresholds are float64, and a float32
+    # copy can land a value on the other side of one.
+    X = np.array([[row.get(col, np.nan) for col in MODEL_COLS]], dtype=np.float64)
 
     # Fill NaN AccuWeather values with NWS equivalents
-    for accu_col, nws_col in ACCU_NWS_FALLBACK.items():
-        if pd.isna(X.loc[0, accu_col]):
-            X.loc[0, accu_col] = X.loc[0, nws_col]
+    for accu_i, nws_i in _ACCU_NWS_FALLBACK_IDX:
+        if np.isnan(X[0, accu_i]):
+            X[0, accu_i] = X[0, nws_i]
 
     return X
 
 
+# scikit-learn release whose HistGradientBoosting internals FlatForest was
+# checked against; from_model() still probes, this just dates the check.
+FLAT_FOREST_SKLEARN = "1.3.0"
+
+
+class FlatForest:
+    """
+    A fitted HistGradientBoostingRegressor's trees packed into flat node
+    arrays and walked level by level for all trees at once in numpy.
+
+    sklearn's predict() pays per-call validation plus a Cython pass per tree,
+    which dominates for the 1-row requests this API serves. Leaf values are
+    summed in tree order starting from the baseline, the same order sklearn
+    accumulates them, so outputs are bit-identical. Built only via
+    from_model(), which returns None for anything it can't reproduce.
+    """
+
+    def __init__(self, model):
+        trees = [predictors[0].nodes for predictors in model._predictors]
+        sizes = np.array([len(t) for t in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        nodes = np.concatenate(trees)
+        shift = np.repeat(offsets, sizes)
+        self_idx = np.arange(len(nodes))
+
+        self.roots = offsets.astype(np.intp)
+        self.value = nodes["value"].astype(np.float64)
+        self.feature = nodes["feature_idx"].astype(np.intp)
+        self.threshold = nodes["num_threshold"].astype(np.float64)
+        self.missing_left = nodes["missing_go_to_left"].astype(bool)
+        self.is_leaf = nodes["is_leaf"].astype(bool)
+        # Leaves point at themselves so finished trees idle in place.
+        self.left = np.where(self.is_leaf, self_idx, nodes["left"] + shift).astype(np.intp)
+        self.right = np.where(self.is_leaf, self_idx, nodes["right"] + shift).astype(np.intp)
+        self.baseline = float(np.ravel(model._baseline_prediction)[0])
+        self.inverse_link = model._loss.link.inverse
+
+    @classmethod
+    def from_model(cls, model, n_probe=256):
+        try:
+            if any(len(p) != 1 or p[0].nodes["is_categorical"].any() for p in model._predictors):
+                return cls._fallback("multi-output or categorical trees")
+            flat = cls(model)
+            rng = np.random.default_rng(0)
+            probe = rng.normal(60, 25, (n_probe, model.n_features_in_))
+            probe[rng.random(probe.shape) < 0.2] = np.nan
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", message="X does not have valid feature names")
+                if not np.array_equal(flat.predict(probe), model.predict(probe)):
+                    return cls._fallback("probe predictions differ")
+            return flat
+        except Exception as e:
+            return cls._fallback(f"{type(e).__name__}: {e}")
+
+    @staticmethod
+    def _fallback(reason):
+        # The flat walk reads private sklearn internals (_predictors,
+        # _baseline_prediction, _loss); say so loudly when they've moved.
+        warnings.warn(
+            f"FlatForest disabled ({reason}); serving via sklearn predict(). "
+            f"Validated against scikit-learn {FLAT_FOREST_SKLEARN}, "
+            f"installed {sklearn.__version__}.",
+            RuntimeWarning,
+            stacklevel=3,
+        )
+        return None
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        node = np.broadcast_to(self.roots, (X.shape[0], self.roots.size)).copy()
+        while not self.is_leaf[node].all():
+            x = np.take_along_axis(X, self.feature[node], axis=1)
+            go_left = np.where(np.isnan(x), self.missing_left[node], x <= self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        # cumsum runs sequentially along the row, matching sklearn's += per tree.
+        leaves = np.concatenate([np.full((X.shape[0], 1), self.baseline), self.value[node]], axis=1)
+        return self.inverse_link(np.cumsum(leaves, axis=1)[:, -1])
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predict() calls into one model.predict().
+
+    Request threads enqueue a 1-row X and block; one worker thread drains up
+    to MAX_BATCH queued rows (waiting at most BATCH_TIMEOUT_MS for stragglers
+    once the first arrives), predicts them in one call and scatters results.
+    With the default timeout of 0 a lone request never waits — batching only
+    kicks in when requests are already queued behind a running predict.
+    """
+
+    def __init__(self, model, max_batch=64, timeout_ms=0.0):
+        self.model = model
+        self.max_batch = max_batch
+        self.timeout_s = timeout_ms / 1000.0
+        self._q = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self):
+        # Started lazily so it's created in each gunicorn worker, not the master.
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, daemon=True)
+                    self._worker.start()
+
+    def predict(self, X):
+        self._ensure_worker()
+        item = {"X": X, "done": threading.Event(), "y": None, "err": None}
+        self._q.put(item)
+        item["done"].wait()
+        if item["err"] is not None:
+            raise item["err"]
+        return item["y"]
+
+    def _drain(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.timeout_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._q.get(timeout=remaining))
+                else:
+                    batch.append(self._q.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._drain(self._q.get())
+            try:
+                yb = self.model.predict(np.vstack([b["X"] for b in batch]))
+                for b, y in zip(batch, yb):
+                    b["y"] = float(y)
+            except Exception as e:
+                for b in batch:
+                    b["err"] = e
+            for b in batch:
+                b["done"].set()
+
+
+# Falls back to the sklearn model when the packed forest can't reproduce it.
+TEMP_PREDICTOR = FlatForest.from_model(TEMP_MODEL) or TEMP_MODEL
+
+# Rows are packed in MODEL_COLS order, so sklearn's feature-name warning is
+# moot. Filtered once here rather than per batch: catch_warnings() swaps the
+# process-global filter list and isn't safe under the request threads.
+if TEMP_PREDICTOR is TEMP_MODEL:
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+# Warm the request path once at import (strptime's lazy import, numpy
+# dispatch, the forest walk) so the first live request doesn't pay for it.
+# Calls the predictor directly: the batcher's thread must start per worker.
+derive_bucket_probabilities(
+    float(TEMP_PREDICTOR.predict(prepare_features({"target_date": "2000-01-01"}))[0]),
+    RESIDUAL_STD,
+)
+
+BATCHER = MicroBatcher(
+    TEMP_PREDICTOR,
+    max_batch=int(os.environ.get("MAX_BATCH", 64)),
+    timeout_ms=float(os.environ.get("BATCH_TIMEOUT_MS", 0)),
+)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson; numpy scalars/arrays serialize natively.
+
+    Honours sort_keys / compact / indent=2 like the default provider, and
+    loads() falls back to stdlib json for bodies orjson rejects (bare NaN).
+    Output is valid JSON but not byte-identical to Flask's for every input:
+    dates are ISO strings rather than HTTP dates, NaN/Infinity become null,
+    non-ASCII is emitted raw rather than \\u-escaped, and small floats are
+    spelled differently (Flask's 1e-05). The current endpoints hit none of
+    these; anything that starts returning such values needs a look.
+    """
+
+    _OPTS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+    _COMPACT = (",", ":")
+
+    def dumps(self, obj, **kwargs):
+        sort_keys = kwargs.pop("sort_keys", self.sort_keys)
+        indent = kwargs.pop("indent", None)
+        if kwargs.get("separators") == self._COMPACT:
+            kwargs.pop("separators")  # orjson's only layout
+        if kwargs or indent not in (None, 0, 2):
+            return super().dumps(obj, sort_keys=sort_keys, indent=indent, **kwargs)
+        option = self._OPTS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass  # e.g. bare NaN / Infinity, which stdlib json accepts
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if args and kwargs:
+            raise TypeError("app.json.response() takes either args or kwargs, not both")
+        obj = args[0] if len(args) == 1 else (args or kwargs or None)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        body = self.dumps(obj, indent=2 if pretty else None)
+        return self._app.response_class(f"{body}\n", mimetype=self.mimetype)
+
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 
 @app.post("/api/predict-ml")
@@ -108,7 +349,7 @@ def predict_ml():
         X = prepare_features(payload)
 
         # Model predicts bias (actual - best_base); base = AccuWeather if available, else NWS
-        predicted_bias = float(TEMP_MODEL.predict(X)[0])
+        predicted_bias = BATCHER.predict(X)
         accu_last = payload.get("accu_last")
         if accu_last is not None:
             base = float(accu_last)
@@ -116,14 +357,12 @@ def predict_ml():
             base = float(payload.get("nws_last", payload.get("nws_mean", 0)))
         temp = base + predicted_bias
         bucket_dict = derive_bucket_probabilities(temp, RESIDUAL_STD)
-        best_bucket = max(bucket_dict, key=bucket_dict.get)
-        confidence = bucket_dict[best_bucket]
-
-        # Top buckets sorted by probability
-        probs = sorted(
-            [{"bucket": b, "p": p} for b, p in bucket_dict.items()],
-            key=lambda d: d["p"], reverse=True,
-        )[:5]
+
+        # Top buckets by probability; nlargest keeps sorted()'s tie order, so
+        # the head is the same bucket max() would pick.
+        top = heapq.nlargest(5, bucket_dict.items(), key=lambda kv: kv[1])
+        best_bucket, confidence = top[0]
+        probs = [{"bucket": b, "p": p} for b, p in top]
 
         return jsonify({
             "temperature": round(temp, 2),
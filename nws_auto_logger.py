@@ -1,17 +1,32 @@
 # nws_auto_logger.py
 import csv
 import datetime
+import functools
+import io
+import json
 import os
 import re
+import tempfile
 import time
-from typing import Optional, Tuple, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from html import unescape
+from typing import Optional, Tuple, Dict, List, NamedTuple
+from zoneinfo import ZoneInfo
 
 import requests
-from bs4 import BeautifulSoup
-import pytz
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from city_config import get_city_config, DEFAULT_CITY
 
+# orjson decodes the NWS forecast / observation JSON straight from bytes and
+# faster than stdlib; workflows that don't install it fall back to json.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 # =========================
 # Time / Config — city-aware
 # =========================
@@ -23,7 +38,7 @@ def set_city(city_key: str) -> None:
     _CITY_CFG = get_city_config(city_key)
 
 def _tz():
-    return pytz.timezone(_CITY_CFG["timezone"])
+    return ZoneInfo(_CITY_CFG["timezone"])  # ZoneInfo caches instances by key
 
 def now_nyc() -> datetime.datetime:
     """Return current time in the active city's timezone."""
@@ -48,13 +63,32 @@ NWS_HEADERS = {
     "Pragma": "no-cache",
 }
 
+# One pooled keep-alive session for every api.weather.gov / forecast.weather.gov
+# call; retries transient 429/5xx instead of failing the run on a blip.
+_SESSION = requests.Session()
+_SESSION.headers.update(NWS_HEADERS)
+_ADAPTER = HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.3,
+                      status_forcelist=[429, 500, 502, 503, 504]),
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
 # Only used by optional local loop mode
 FETCH_TIMES = ["19:30", "21:00", "23:00", "05:00", "06:00", "07:00", "09:00",
                "10:00", "10:50", "11:00", "12:00", "13:00", "14:00", "15:00"]
+FETCH_TIMES_SET = frozenset(FETCH_TIMES)
+# City-local times the actual gates open (6pm provisional, midnight finalize)
+# and the finalize window closes; loop mode also wakes at these.
+LOOP_GATE_TIMES = ("18:00", "00:00", "12:00")
 
 # =========================
 # CSV helpers
 # =========================
+# Whole-log scans read in 1 MiB chunks rather than the default 8 KiB.
+READ_BUFFER = 1 << 20
+
 BASE_HEADER = [
     "timestamp", "target_date", "forecast_or_actual", "forecast_time",
     "predicted_high", "forecast_detail", "cli_date", "actual_high", "high_time"
@@ -65,36 +99,48 @@ def ensure_csv_header() -> None:
         with open(_csv_file(), mode="w", newline="") as f:
             csv.writer(f).writerow(BASE_HEADER)
 
+# path -> ((ino, mtime_ns, size), header, rows): each log is parsed once per file
+# version, however many times _read_all_rows is called in a run.
+_PARSED_CSV: Dict[str, tuple] = {}
+
+def _parsed_csv(path: str) -> Tuple[List[str], List[dict]]:
+    """(header, DictReader rows) of a log CSV, cached until the file changes."""
+    st = os.stat(path)
+    version = (st.st_ino, st.st_mtime_ns, st.st_size)
+    hit = _PARSED_CSV.get(path)
+    if hit is not None and hit[0] == version:
+        return hit[1], hit[2]
+    with open(path, newline="", encoding="utf-8", buffering=READ_BUFFER) as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+        header = list(reader.fieldnames or [])
+    _PARSED_CSV[path] = (version, header, rows)
+    return header, rows
+
 def _read_all_rows(include_accu: bool = False) -> Tuple[List[dict], List[str]]:
     """
     Read rows from NWS file; optionally also include AccuWeather rows in-memory.
     NEVER write combined rows back to NWS CSV.
+    Rows are fresh dicts on every call, so callers may mutate them freely.
     """
     ensure_csv_header()
     rows: List[dict] = []
     fieldnames = list(BASE_HEADER)
 
-    # Always read NWS
-    if os.path.exists(_csv_file()):
-        with open(_csv_file(), newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            if reader.fieldnames:
-                for fn in reader.fieldnames:
-                    if fn not in fieldnames:
-                        fieldnames.append(fn)
-            for r in reader:
-                rows.append(r)
-
+    paths = [_csv_file()]
     # Optionally include AccuWeather (for analytics only)
-    if include_accu and os.path.exists(_accu_csv_file()):
-        with open(_accu_csv_file(), newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            if reader.fieldnames:
-                for fn in reader.fieldnames:
-                    if fn not in fieldnames:
-                        fieldnames.append(fn)
-            for r in reader:
-                rows.append(r)
+    if include_accu:
+        paths.append(_accu_csv_file())
+
+    for path in paths:
+        try:
+            header, parsed = _parsed_csv(path)
+        except FileNotFoundError:
+            continue
+        for fn in header:
+            if fn not in fieldnames:
+                fieldnames.append(fn)
+        rows.extend([dict(r) for r in parsed])
 
     return rows, fieldnames
 
@@ -102,52 +148,144 @@ def _read_all_rows(include_accu: bool = False) -> Tuple[List[dict], List[str]]:
 def _write_all_rows(rows: List[dict], fieldnames: List[str]) -> None:
     # Never persist AccuWeather rows into the NWS CSV
     nws_only = [r for r in rows if (r.get("source") or "").lower() != "accuweather"]
-    with open(_csv_file(), "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=fieldnames)
-        w.writeheader()
-        w.writerows(nws_only)
+    # Render in memory first (one large write, and a bad row fails before we
+    # touch the disk), then write a sibling temp file and swap it in, so a
+    # crash mid-rewrite can never leave a truncated log behind.
+    buf = io.StringIO(newline="")
+    w = csv.DictWriter(buf, fieldnames=fieldnames)
+    w.writeheader()
+    w.writerows(nws_only)
+    path = _csv_file()
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", newline="") as f:
+            f.write(buf.getvalue())
+        if os.path.exists(path):
+            os.chmod(tmp, os.stat(path).st_mode)  # mkstemp files are 0600
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
     
-def _append_row(row: Dict[str, str]) -> None:
+def _append_rows(rows: List[Dict[str, str]]) -> None:
     """
     Append using current file header so column count always matches.
     Missing keys will be empty; extra keys are ignored.
     """
-    ensure_csv_header()
-    with open(_csv_file(), newline="") as f:
-        reader = csv.DictReader(f)
-        fns = reader.fieldnames or (BASE_HEADER)
-    safe_row = {k: row.get(k, "") for k in fns}
-    with open(_csv_file(), "a", newline="") as f:
+    if not rows:
+        return
+    # One open: "a+" creates the file, lets us read the header, and still
+    # appends at the end whatever the read position.
+    with open(_csv_file(), "a+", newline="") as f:
+        f.seek(0)
+        fns = next(csv.reader([f.readline()]), None) or BASE_HEADER
         w = csv.DictWriter(f, fieldnames=fns)
-        w.writerow(safe_row)
+        if f.tell() == 0:
+            w.writeheader()
+        w.writerows({k: row.get(k, "") for k in fns} for row in rows)
+
+def _append_row(row: Dict[str, str]) -> None:
+    _append_rows([row])
 
 # =========================
 # Forecast helpers
 # =========================
-def _period_date_local(start_iso: str) -> datetime.date:
-    """Convert API period startTime ISO to America/New_York date."""
-    dt = datetime.datetime.fromisoformat(start_iso.replace("Z", "+00:00"))
-    return dt.astimezone(_tz()).date()
+@functools.lru_cache(maxsize=128)
+def _iso_to_local_date(start_iso: str, tz_name: str) -> datetime.date:
+    dt = datetime.datetime.fromisoformat(start_iso)  # 3.11+ accepts a trailing "Z"
+    return dt.astimezone(ZoneInfo(tz_name)).date()
 
-def get_forecast_periods() -> List[dict]:
-    r = requests.get(_nws_endpoint(), headers=NWS_HEADERS)
+def _period_date_local(start_iso: str) -> datetime.date:
+    """Convert API period startTime ISO to the active city's local date."""
+    # Periods repeat their startTime across today/tomorrow picks and re-runs.
+    return _iso_to_local_date(start_iso, _CITY_CFG["timezone"])
+
+# The points -> gridpoint forecast URL mapping is effectively static; cache it
+# per endpoint so repeat calls (loop mode, today + tomorrow) skip a round trip.
+# The in-process dict is backed by a temp file so separate runs on the same
+# host (cron, back-to-back city runs) skip the points call too.
+FORECAST_URL_TTL = 24 * 3600
+_FORECAST_URL_CACHE: Dict[str, Tuple[float, str]] = {}
+_FORECAST_URL_FILE = os.path.join(tempfile.gettempdir(), "nws_forecast_urls.json")
+
+def _load_forecast_url_file() -> Dict[str, Tuple[float, str]]:
+    try:
+        with open(_FORECAST_URL_FILE, encoding="utf-8") as f:
+            return {k: (float(v[0]), str(v[1])) for k, v in json.load(f).items()}
+    except (OSError, ValueError, TypeError, IndexError, AttributeError):
+        return {}
+
+def _store_forecast_url_file(endpoint: str, entry: Optional[Tuple[float, str]]) -> None:
+    """Set (or with entry=None, drop) one endpoint's row, keeping other cities'."""
+    cached = _load_forecast_url_file()
+    if entry is None:
+        cached.pop(endpoint, None)
+    else:
+        cached[endpoint] = entry
+    try:
+        with open(_FORECAST_URL_FILE, "w", encoding="utf-8") as f:
+            json.dump(cached, f)
+    except OSError as e:
+        print(f"⚠️ forecast URL cache write failed: {e}")
+
+def _forecast_url() -> str:
+    endpoint = _nws_endpoint()
+    hit = _FORECAST_URL_CACHE.get(endpoint)
+    if hit is None:
+        hit = _load_forecast_url_file().get(endpoint)
+    if hit and time.time() - hit[0] < FORECAST_URL_TTL:
+        _FORECAST_URL_CACHE[endpoint] = hit
+        return hit[1]
+    r = _SESSION.get(endpoint, timeout=(5, 25))
     r.raise_for_status()
-    forecast_url = r.json()["properties"]["forecast"]
-    r2 = requests.get(forecast_url, headers=NWS_HEADERS)
-    r2.raise_for_status()
-    return r2.json()["properties"]["periods"]
+    url = _loads(r.content)["properties"]["forecast"]
+    _FORECAST_URL_CACHE[endpoint] = (time.time(), url)
+    _store_forecast_url_file(endpoint, _FORECAST_URL_CACHE[endpoint])
+    return url
+
+def _forget_forecast_url() -> None:
+    """Drop the cached URL for the active city (memory and file)."""
+    _FORECAST_URL_CACHE.pop(_nws_endpoint(), None)
+    _store_forecast_url_file(_nws_endpoint(), None)
+
+# Every entrypoint (run_smart, run_once, run_all_once, loop mode) logs today
+# then tomorrow back to back from the same forecast product; serve the second
+# call from the first fetch. Short enough that loop-mode slots ten minutes
+# apart still fetch fresh.
+PERIODS_TTL = 120
+_PERIODS_CACHE: Dict[str, Tuple[float, List[dict]]] = {}
 
-def pick_today_day_period(periods: List[dict]) -> Optional[dict]:
+def get_forecast_periods() -> List[dict]:
+    endpoint = _nws_endpoint()
+    hit = _PERIODS_CACHE.get(endpoint)
+    if hit and time.monotonic() - hit[0] < PERIODS_TTL:
+        return list(hit[1])
+    url = _forecast_url()
+    try:
+        r2 = _SESSION.get(url, timeout=(5, 25))
+        r2.raise_for_status()
+    except requests.exceptions.RequestException:
+        # Don't keep serving a URL that stopped working (bad status, or the
+        # Retry adapter giving up with RetryError); re-resolve next call.
+        _forget_forecast_url()
+        raise
+    periods = _loads(r2.content)["properties"]["periods"]
+    _PERIODS_CACHE[endpoint] = (time.monotonic(), periods)
+    return list(periods)
+
+def pick_today_day_period(periods: List[dict],
+                          today: Optional[datetime.date] = None) -> Optional[dict]:
     """Pick the *daytime* period whose start is today's local date."""
-    t = today_nyc()
+    t = today or today_nyc()
     for p in periods:
         if p.get("isDaytime") and _period_date_local(p["startTime"]) == t:
             return p
     return None
 
-def pick_tomorrow_day_period(periods: List[dict]) -> Optional[dict]:
+def pick_tomorrow_day_period(periods: List[dict],
+                             today: Optional[datetime.date] = None) -> Optional[dict]:
     """Pick the *daytime* period whose start is tomorrow's local date."""
-    tm = today_nyc() + datetime.timedelta(days=1)
+    tm = (today or today_nyc()) + datetime.timedelta(days=1)
     for p in periods:
         if p.get("isDaytime") and _period_date_local(p["startTime"]) == tm:
             return p
@@ -167,9 +305,9 @@ def _latest_ob_f(station: str = None) -> Optional[int]:
     station = station or _obs_station()
     try:
         u = f"https://api.weather.gov/stations/{station}/observations?limit=1"
-        r = requests.get(u, headers=NWS_HEADERS, timeout=15)
+        r = _SESSION.get(u, timeout=15)
         r.raise_for_status()
-        feats = (r.json().get("features") or [])
+        feats = (_loads(r.content).get("features") or [])
         if not feats:
             return None
         c = (((feats[0] or {}).get("properties") or {}).get("temperature") or {}).get("value")
@@ -187,9 +325,9 @@ def _six_hour_max_f(station: str = None) -> Optional[int]:
         start = now - datetime.timedelta(hours=6)
         u = (f"https://api.weather.gov/stations/{station}/observations"
              f"?start={start.isoformat()}Z&end={now.isoformat()}Z&limit=100")
-        r = requests.get(u, headers=NWS_HEADERS, timeout=20)
+        r = _SESSION.get(u, timeout=20)
         r.raise_for_status()
-        feats = r.json().get("features") or []
+        feats = _loads(r.content).get("features") or []
         vals = []
         for f in feats:
             c = (((f or {}).get("properties") or {}).get("temperature") or {}).get("value")
@@ -204,23 +342,77 @@ def _six_hour_max_f(station: str = None) -> Optional[int]:
 
 def compute_today_gate_f() -> Optional[int]:
     """Gate = max(recent observed, six-hour max), or None if unavailable."""
-    ro  = _latest_ob_f()
-    six = _six_hour_max_f()
+    # The two observation queries are independent; overlap their round trips.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        ro_f  = pool.submit(_latest_ob_f)
+        six_f = pool.submit(_six_hour_max_f)
+        ro, six = ro_f.result(), six_f.result()
     if ro is None and six is None:
         return None
     return max(v for v in (ro, six) if v is not None)
 
-def _get_last_forecast_row_for_date(target_date: str) -> Optional[dict]:
+class _LogIndex(NamedTuple):
+    header: List[str]
+    last_forecast: Dict[str, List[str]]    # target_date -> raw row of its last forecast
+    actuals: Dict[str, Tuple[Optional[str], str]]  # cli_date -> first actual's (actual_high, high_time)
+    logged_hours: set                      # (forecast_or_actual, "YYYY-MM-DD HH" of timestamp)
+
+_EMPTY_INDEX = _LogIndex([], {}, {}, set())
+
+def _cell(row: List[str], i: int) -> Optional[str]:
+    """row[i], or None past the end of a short row (DictReader's restval)."""
+    return row[i] if i < len(row) else None
+
+# (path, ino, mtime_ns, size) -> _LogIndex
+_LOG_INDEX: Dict[tuple, _LogIndex] = {}
 
+def _log_index() -> _LogIndex:
+    """
+    One csv.reader pass over the NWS log per file version, shared by the
+    dedupe checks and upsert below; any write changes inode/mtime/size and
+    forces a fresh pass.
+    """
+    path = _csv_file()
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return _EMPTY_INDEX
+    key = (path, st.st_ino, st.st_mtime_ns, st.st_size)
+    hit = _LOG_INDEX.get(key)
+    if hit is not None:
+        return hit
+
+    last_forecast: Dict[str, List[str]] = {}
+    actuals: Dict[str, Tuple[Optional[str], str]] = {}
+    logged_hours: set = set()
+    with open(path, newline="", buffering=READ_BUFFER) as f:
+        reader = csv.reader(f)
+        header = next(reader, None) or list(BASE_HEADER)
+        col = {name: i for i, name in enumerate(header)}
+        i_ts, i_kind, i_target, i_cli, i_high, i_time = (
+            col.get(name, BASE_HEADER.index(name))
+            for name in ("timestamp", "forecast_or_actual", "target_date", "cli_date",
+                         "actual_high", "high_time")
+        )
+        for row in reader:
+            kind = _cell(row, i_kind)
+            logged_hours.add((kind, (_cell(row, i_ts) or "")[:13]))
+            if kind == "forecast":
+                last_forecast[_cell(row, i_target)] = row
+            elif kind == "actual":
+                actuals.setdefault(_cell(row, i_cli), (_cell(row, i_high), _cell(row, i_time) or ""))
+    hit = _LogIndex(header, last_forecast, actuals, logged_hours)
+    _LOG_INDEX.clear()
+    _LOG_INDEX[key] = hit
+    return hit
+
+def _get_last_forecast_row_for_date(target_date: str) -> Optional[dict]:
     """Return the last (most recent) forecast row for target_date, or None."""
-    if not os.path.exists(_csv_file()):
+    idx = _log_index()
+    row = idx.last_forecast.get(target_date)
+    if row is None:
         return None
-    last = None
-    with open(_csv_file(), newline="") as f:
-        for row in csv.DictReader(f):
-            if row.get("forecast_or_actual") == "forecast" and row.get("target_date") == target_date:
-                last = row
-    return last
+    return {name: _cell(row, i) for i, name in enumerate(idx.header)}
 
 def forecast_changed_since_last(target_date: str, new_value: str) -> bool:
     """True if no prior forecast for the date, or the last one differs."""
@@ -231,13 +423,7 @@ def forecast_changed_since_last(target_date: str, new_value: str) -> bool:
 
 def actual_exists_for_date(target_date: str) -> bool:
     """True if an actual row for this date already exists (freeze further forecasts)."""
-    if not os.path.exists(_csv_file()):
-        return False
-    with open(_csv_file(), newline="") as f:
-        for row in csv.DictReader(f):
-            if row.get("forecast_or_actual") == "actual" and row.get("cli_date") == target_date:
-                return True
-    return False
+    return target_date in _log_index().actuals
 
 # =========================
 # Bias helpers (shared)
@@ -257,20 +443,44 @@ def _get_season_from_month(month: int) -> str:
             return season
     return "fall"  # unreachable, but safe default
 
+# high_time / clock patterns, compiled once rather than per row in the bias loops
+_AMPM_RE = re.compile(r'\b(AM|PM)\b', re.IGNORECASE)
+_AMPM_STRIP_RE = re.compile(r'\s*(AM|PM)\s*', re.IGNORECASE)
+_HHMM_RE = re.compile(r'^\s*(\d{1,2}):(\d{2})\s*$')
+
+def _hhmm_fast(s: str) -> Optional[Tuple[int, int]]:
+    """(hh, mm) for a bare 'H:MM' / 'HH:MM' digit string, else None."""
+    i = s.find(":")
+    if 0 < i <= 2 and len(s) - i == 3 and s[:i].isdecimal() and s[i + 1:].isdecimal():
+        return int(s[:i]), int(s[i + 1:])
+    return None
+
 def _minutes_from_hhmm_ampm(s: str) -> Optional[int]:
     """Parses 'H:MM', 'HH:MM', optionally with ' AM/PM', returns minutes since midnight."""
     if not s:
         return None
     s = s.strip()
     ap = None
-    m = re.search(r'\b(AM|PM)\b', s, re.IGNORECASE)
-    if m:
-        ap = m.group(1).upper()
-        s = re.sub(r'\s*(AM|PM)\s*', '', s, flags=re.IGNORECASE)
-    m2 = re.match(r'^\s*(\d{1,2}):(\d{2})\s*$', s)
-    if not m2:
-        return None
-    hh, mm = int(m2.group(1)), int(m2.group(2))
+    # Fast path for the usual shapes ("3:47", "3:47 PM"); anything else takes
+    # the regex route below, which is the reference behaviour.
+    if len(s) > 3 and s[-3].isspace() and s[-2:].upper() in ("AM", "PM"):
+        hhmm = _hhmm_fast(s[:-3].rstrip())
+        if hhmm:
+            ap = s[-2:].upper()
+    else:
+        hhmm = _hhmm_fast(s)
+    if hhmm:
+        hh, mm = hhmm
+    else:
+        ap = None
+        m = _AMPM_RE.search(s)
+        if m:
+            ap = m.group(1).upper()
+            s = _AMPM_STRIP_RE.sub('', s)
+        m2 = _HHMM_RE.match(s)
+        if not m2:
+            return None
+        hh, mm = int(m2.group(1)), int(m2.group(2))
     if ap:
         hh = (hh % 12) + (12 if ap == "PM" else 0)
     if not (0 <= hh <= 23 and 0 <= mm <= 59):
@@ -294,45 +504,51 @@ def _minutes_from_forecast_time_cell(s: str) -> Optional[int]:
     return None
 
 def _float_or_none(x: str) -> Optional[float]:
+    if x is None or (type(x) is str and not x):
+        return None  # blank cells are the common miss; skip the raise/catch
     try:
         v = float(x)
-        if not (v == v):  # NaN
-            return None
-        return v
     except Exception:
         return None
+    return None if v != v else v  # NaN
 
-def _compute_avg_bias_and_today_mean(rows: List[dict], today_iso: str) -> Tuple[Optional[float], Optional[float]]:
+def _build_bias_index(rows: List[dict]) -> Dict[str, Tuple[float, float]]:
     """
-    Dashboard-equivalent:
-      - For each completed day: bias = actual_high - mean(pre-high forecasts).
-      - avgBias = mean of daily biases.
-      - todayMean = mean(pre-high forecasts for today) if available.
+    date -> (actual_high, mean of pre-high forecasts) for every completed day
+    that has usable forecasts, in the order dates first appear in `rows`.
+
+    The bias aggregators below all reduce to this per-day table; build it
+    once and pass it as `index=` when calling more than one of them.
     """
-    by_date: Dict[str, List[dict]] = {}
+    # date -> (actual rows, forecast rows), each row's kind read once
+    by_date: Dict[str, Tuple[List[dict], List[dict]]] = {}
     for r in rows:
-        d = r.get("cli_date") if r.get("forecast_or_actual") == "actual" else r.get("target_date")
+        kind = r.get("forecast_or_actual")
+        d = r.get("cli_date") if kind == "actual" else r.get("target_date")
         if not d:
             continue
-        by_date.setdefault(d, []).append(r)
-
-    biases: List[float] = []
-    today_mean: Optional[float] = None
-
-    for d, rs in by_date.items():
-        act = next((x for x in rs if x.get("forecast_or_actual") == "actual" and _float_or_none(x.get("actual_high")) is not None), None)
-        if not act:
+        day = by_date.get(d)
+        if day is None:
+            day = by_date[d] = ([], [])
+        if kind == "actual":
+            day[0].append(r)
+        elif kind == "forecast":
+            day[1].append(r)
+
+    index: Dict[str, Tuple[float, float]] = {}
+    for d, (acts, fcs) in by_date.items():
+        # first actual with a usable high
+        for act in acts:
+            actual_high = _float_or_none(act.get("actual_high"))
+            if actual_high is not None:
+                break
+        else:
             continue
-        actual_high = _float_or_none(act.get("actual_high"))
         high_time = (act.get("high_time") or "").strip()
-        if actual_high is None:
-            continue
 
         fc_vals: List[float] = []
         high_min = _minutes_from_hhmm_ampm(high_time) if high_time else None
-        for x in rs:
-            if x.get("forecast_or_actual") != "forecast":
-                continue
+        for x in fcs:
             ph = _float_or_none(x.get("predicted_high"))
             if ph is None:
                 continue
@@ -343,18 +559,32 @@ def _compute_avg_bias_and_today_mean(rows: List[dict], today_iso: str) -> Tuple[
             fc_vals.append(ph)
 
         if fc_vals:
-            mean_fc = sum(fc_vals) / len(fc_vals)
-            biases.append(actual_high - mean_fc)
-            if d == today_iso:
-                today_mean = mean_fc
+            index[d] = (actual_high, sum(fc_vals) / len(fc_vals))
+    return index
 
+def _compute_avg_bias_and_today_mean(
+    rows: List[dict],
+    today_iso: str,
+    index: Optional[Dict[str, Tuple[float, float]]] = None,
+) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Dashboard-equivalent:
+      - For each completed day: bias = actual_high - mean(pre-high forecasts).
+      - avgBias = mean of daily biases.
+      - todayMean = mean(pre-high forecasts for today) if available.
+    """
+    if index is None:
+        index = _build_bias_index(rows)
+    biases = [actual_high - mean_fc for actual_high, mean_fc in index.values()]
+    today = index.get(today_iso)
     avg_bias = (sum(biases) / len(biases)) if biases else None
-    return avg_bias, today_mean
+    return avg_bias, (today[1] if today else None)
 
 def _compute_avg_bias_excluding(
     rows: List[dict],
     exclude_date_iso: str,
     target_month: Optional[int] = None,
+    index: Optional[Dict[str, Tuple[float, float]]] = None,
 ) -> Optional[float]:
     """
     Average bias across completed days, excluding exclude_date_iso.
@@ -366,54 +596,26 @@ def _compute_avg_bias_excluding(
 
     Pass exclude_date_iso='' to exclude nothing.
     """
-    by_date: Dict[str, List[dict]] = {}
-    for r in rows:
-        d = r.get("cli_date") if r.get("forecast_or_actual") == "actual" else r.get("target_date")
-        if not d:
-            continue
-        by_date.setdefault(d, []).append(r)
+    if index is None:
+        index = _build_bias_index(rows)
 
     global_biases: List[float] = []
     seasonal_biases: List[float] = []
     target_season = _get_season_from_month(target_month) if target_month is not None else None
 
-    for d, rs in by_date.items():
+    for d, (actual_high, mean_fc) in index.items():
         if exclude_date_iso and d == exclude_date_iso:
             continue
-        act = next((x for x in rs if x.get("forecast_or_actual") == "actual" and _float_or_none(x.get("actual_high")) is not None), None)
-        if not act:
-            continue
-        actual_high = _float_or_none(act.get("actual_high"))
-        high_time = (act.get("high_time") or "").strip()
-        if actual_high is None:
-            continue
-
-        fc_vals: List[float] = []
-        high_min = _minutes_from_hhmm_ampm(high_time) if high_time else None
-        for x in rs:
-            if x.get("forecast_or_actual") != "forecast":
-                continue
-            ph = _float_or_none(x.get("predicted_high"))
-            if ph is None:
-                continue
-            if high_min is not None:
-                fc_min = _minutes_from_forecast_time_cell(x.get("forecast_time") or "")
-                if fc_min is None or fc_min > high_min:
-                    continue
-            fc_vals.append(ph)
-
-        if fc_vals:
-            mean_fc = sum(fc_vals) / len(fc_vals)
-            bias = actual_high - mean_fc
-            global_biases.append(bias)
-            # also bucket into seasonal list if target season set
-            if target_season is not None:
-                try:
-                    d_month = int(d.split("-")[1])
-                    if _get_season_from_month(d_month) == target_season:
-                        seasonal_biases.append(bias)
-                except Exception:
-                    pass
+        bias = actual_high - mean_fc
+        global_biases.append(bias)
+        # also bucket into seasonal list if target season set
+        if target_season is not None:
+            try:
+                d_month = int(d.split("-")[1])
+                if _get_season_from_month(d_month) == target_season:
+                    seasonal_biases.append(bias)
+            except Exception:
+                pass
 
     global_avg = (sum(global_biases) / len(global_biases)) if global_biases else None
 
@@ -434,58 +636,49 @@ def _compute_avg_bias_excluding(
         # Too few seasonal days — fall back to global
         return global_avg
 
-def _compute_today_pre_high_mean(rows: List[dict], today_iso: str) -> Optional[float]:
+def _compute_today_pre_high_mean(
+    rows: List[dict],
+    today_iso: str,
+    index: Optional[Dict[str, Tuple[float, float]]] = None,
+) -> Optional[float]:
     """Mean of today's forecasts that occurred before today's high time."""
-    rs = [r for r in rows if (r.get("forecast_or_actual") == "forecast" and r.get("target_date") == today_iso) or
-                           (r.get("forecast_or_actual") == "actual"   and r.get("cli_date")    == today_iso)]
-    act = next((x for x in rs if x.get("forecast_or_actual") == "actual" and _float_or_none(x.get("actual_high")) is not None), None)
-    if not act:
-        return None
-    high_time = (act.get("high_time") or "").strip()
-    high_min = _minutes_from_hhmm_ampm(high_time) if high_time else None
-
-    vals: List[float] = []
-    for x in rs:
-        if x.get("forecast_or_actual") != "forecast":
-            continue
-        ph = _float_or_none(x.get("predicted_high"))
-        if ph is None:
-            continue
-        if high_min is not None:
-            fc_min = _minutes_from_forecast_time_cell(x.get("forecast_time") or "")
-            if fc_min is None or fc_min > high_min:
-                continue
-        vals.append(ph)
-
-    if not vals:
-        return None
-    return sum(vals) / len(vals)
+    if index is None:
+        # Only today's rows matter; don't index every other day just for this.
+        index = _build_bias_index([
+            r for r in rows
+            if (r.get("forecast_or_actual") == "forecast" and r.get("target_date") == today_iso) or
+               (r.get("forecast_or_actual") == "actual"   and r.get("cli_date")    == today_iso)
+        ])
+    today = index.get(today_iso)
+    return today[1] if today else None
 
 # =========================
 # Forecast logging
 # =========================
-def log_forecast() -> None:
-    """Capture today's forecast high if it changed and no actual is logged yet."""
+def _today_forecast_row() -> Optional[Dict[str, str]]:
+    """Today's forecast row to log, or None if nothing should be captured."""
     print("🔍 Fetching today’s forecast...")
     periods = get_forecast_periods()
-    period = pick_today_day_period(periods)
+    # One clock read per row, so its date and timestamp can't straddle midnight
+    now = now_nyc()
+    period = pick_today_day_period(periods, now.date())
     if not period:
         print("⚠️ No valid daytime period found for *today*.")
-        return
+        return None
 
-    target_date = today_nyc().isoformat()
+    target_date = now.date().isoformat()
 
     # Freeze forecasts once actual exists
     if actual_exists_for_date(target_date):
         print(f"⏭️ Actual already logged for {target_date}; freezing forecast capture.")
-        return
+        return None
 
     new_val = str(period.get("temperature"))
     if not forecast_changed_since_last(target_date, new_val):
         print(f"⏭️ Unchanged since last for {target_date}: {new_val}°F")
-        return
+        return None
 
-    now_local = now_nyc().strftime("%Y-%m-%d %H:%M:%S")
+    now_local = now.strftime("%Y-%m-%d %H:%M:%S")
 
     # Gate: skip capture if today's D0 forecast <= max(recent obs, 6-hr max)
     gate = compute_today_gate_f()
@@ -497,8 +690,7 @@ def log_forecast() -> None:
         print(f"⏭️ Gate active: forecast {nv_int}°F ≤ gate {gate}°F — keeping capture")
         # no return; forecast will still be logged
 
-
-    _append_row({
+    return {
         "timestamp": now_local,
         "target_date": target_date,
         "forecast_or_actual": "forecast",
@@ -508,28 +700,28 @@ def log_forecast() -> None:
         "cli_date": "",
         "actual_high": "",
         "high_time": "",
-    })
-    print(f"✅ Logged forecast for today: {new_val}°F")
+    }
 
-def log_forecast_for_tomorrow() -> None:
-    """Capture tomorrow's forecast high if it changed."""
+def _tomorrow_forecast_row() -> Optional[Dict[str, str]]:
+    """Tomorrow's forecast row to log, or None if unchanged/unavailable."""
     print("🔍 Fetching tomorrow’s forecast...")
     periods = get_forecast_periods()
-    period = pick_tomorrow_day_period(periods)
+    now = now_nyc()
+    period = pick_tomorrow_day_period(periods, now.date())
     if not period:
         print("⚠️ No valid daytime period found for *tomorrow*.")
-        return
+        return None
 
-    tm = (today_nyc() + datetime.timedelta(days=1)).isoformat()
+    tm = (now.date() + datetime.timedelta(days=1)).isoformat()
     new_val = str(period.get("temperature"))
 
     if not forecast_changed_since_last(tm, new_val):
         print(f"⏭️ Unchanged since last for {tm}: {new_val}°F")
-        return
+        return None
 
-    now_local = now_nyc().strftime("%Y-%m-%d %H:%M:%S")
+    now_local = now.strftime("%Y-%m-%d %H:%M:%S")
 
-    _append_row({
+    return {
         "timestamp": now_local,
         "target_date": tm,
         "forecast_or_actual": "forecast",
@@ -539,13 +731,52 @@ def log_forecast_for_tomorrow() -> None:
         "cli_date": "",
         "actual_high": "",
         "high_time": "",
-    })
-    print(f"✅ Logged forecast for {tm}: {new_val}°F")
+    }
+
+def _report_logged(row: Dict[str, str]) -> None:
+    """Success line for a forecast row, once it is actually on disk."""
+    day = "today" if row["target_date"] == row["timestamp"][:10] else row["target_date"]
+    print(f"✅ Logged forecast for {day}: {row['predicted_high']}°F")
+
+def log_forecast() -> None:
+    """Capture today's forecast high if it changed and no actual is logged yet."""
+    row = _today_forecast_row()
+    if row:
+        _append_row(row)
+        _report_logged(row)
+
+def log_forecast_for_tomorrow() -> None:
+    """Capture tomorrow's forecast high if it changed."""
+    row = _tomorrow_forecast_row()
+    if row:
+        _append_row(row)
+        _report_logged(row)
+
+def log_both_forecasts() -> None:
+    """
+    log_forecast() then log_forecast_for_tomorrow(), written in one append.
+    Today's row is still written if tomorrow's step raises.
+    """
+    rows = []
+    try:
+        for build in (_today_forecast_row, _tomorrow_forecast_row):
+            row = build()
+            if row:
+                rows.append(row)
+    finally:
+        _append_rows(rows)
+        for row in rows:
+            _report_logged(row)
 
 # =========================
 # CLI parsing (robust)
 # =========================
 _TIME_TOKEN = re.compile(r'^\d{3,4}$|^\d{1,2}:\d{2}$', re.ASCII)
+_LEADING_DIGITS = re.compile(r'\d+')
+# Whole lines that can matter to the parser: section headers (TODAY/YESTERDAY
+# after leading blanks) and anything mentioning MAXIMUM. One sweep over the
+# report instead of a Python-level pass over every line.
+_CLI_KEY_LINE = re.compile(r'^(?:[^\S\n]*(?:TODAY|YESTERDAY)|[^\n]*MAXIMUM)[^\n]*', re.MULTILINE)
 
 def _normalize_cli_time(raw: str, ampm: Optional[str]) -> str:
     """
@@ -594,7 +825,7 @@ def _normalize_cli_time(raw: str, ampm: Optional[str]) -> str:
         utc_dt = datetime.datetime(today.year, today.month, today.day,
                                    utc_hour % 24, int(mm), 0,
                                    tzinfo=datetime.timezone.utc)
-        local_dt = utc_dt.astimezone(pytz.timezone(tz_name))
+        local_dt = utc_dt.astimezone(ZoneInfo(tz_name))
         local_h = local_dt.hour
         local_m = local_dt.minute
         local_ap = "AM" if local_h < 12 else "PM"
@@ -614,8 +845,9 @@ def _parse_cli_sections(cli_text: str) -> Dict[str, Optional[Tuple[str, str]]]:
     today_pair: Optional[Tuple[str, str]] = None
     yday_pair: Optional[Tuple[str, str]] = None
 
-    for raw_line in cli_text.splitlines():
-        line_up = raw_line.strip().upper()
+    # Re-join on "\n" so the sweep sees exactly the lines splitlines() would.
+    for m in _CLI_KEY_LINE.finditer("\n".join(cli_text.upper().splitlines())):
+        line_up = m.group().strip()
 
         if line_up.startswith("TODAY"):
             current = "TODAY"; continue
@@ -635,9 +867,9 @@ def _parse_cli_sections(cli_text: str) -> Dict[str, Optional[Tuple[str, str]]]:
 
             # NWS CLI may append suffixes like "R" (record) to temps, e.g. "80R"
             if i + 1 < len(parts):
-                m_temp = re.match(r'^(\d+)', parts[i+1])
+                m_temp = _LEADING_DIGITS.match(parts[i+1])
                 if m_temp:
-                    temp = m_temp.group(1)
+                    temp = m_temp.group()
             if i + 2 < len(parts) and _TIME_TOKEN.match(parts[i+2]):
                 tkn_time = parts[i+2]
             if i + 3 < len(parts) and parts[i+3] in ("AM", "PM"):
@@ -649,15 +881,53 @@ def _parse_cli_sections(cli_text: str) -> Dict[str, Optional[Tuple[str, str]]]:
                     today_pair = (temp, t_clean)
                 if current == "YESTERDAY" and not yday_pair:
                     yday_pair = (temp, t_clean)
+                if today_pair and yday_pair:
+                    break  # first pair of each wins; the rest can't change them
 
     return {"TODAY": today_pair, "YESTERDAY": yday_pair}
 
 # =========================
 # Actual (provisional + final-upsert)
 # =========================
-def log_actual_today_if_after_6pm_local() -> None:
+# The CLI page is a full NWS site shell around one <pre>; pull that out with
+# a regex instead of parsing the whole document.
+_PRE_RE = re.compile(r'<pre\b[^>]*>(.*?)</pre\s*>', re.DOTALL | re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]*>')
+
+def _cli_pre_text(html: str) -> Optional[str]:
+    """Text of the first <pre> on a CLI product page, or None if there isn't one."""
+    m = _PRE_RE.search(html)
+    return unescape(_TAG_RE.sub("", m.group(1))) if m else None
+
+_PRE_END = re.compile(rb'</pre\s*>', re.IGNORECASE)
+
+def _fetch_cli_html(url: str, chunk_size: int = 8192) -> str:
+    """
+    CLI product page, read only up to the first </pre> (everything after it
+    is site chrome). Decodes with the server's charset, else UTF-8, so
+    requests never runs charset detection over the body.
+    """
+    buf = bytearray()
+    with _SESSION.get(url, timeout=(5, 25), stream=True) as r:
+        for chunk in r.iter_content(chunk_size=chunk_size):
+            # re-check a few bytes back in case the tag straddles two chunks
+            start = max(0, len(buf) - 8)
+            buf += chunk
+            if _PRE_END.search(buf, start):
+                break
+        encoding = r.encoding or "utf-8"
+    return buf.decode(encoding, errors="replace")
+
+def _cli_url() -> str:
+    """The active city's CLI product page (latest version)."""
+    return (f"https://forecast.weather.gov/product.php"
+            f"?site={_CITY_CFG['cli_site']}&issuedby={_CITY_CFG['cli_issuedby']}"
+            f"&product=CLI&format=CI&version=1&glossary=0")
+
+def log_actual_today_if_after_6pm_local(cli_html: Optional[str] = None) -> None:
     """
     After 6pm ET, log 'TODAY MAXIMUM' from v1 as a provisional actual.
+    `cli_html` is an already fetched CLI page; fetched here if omitted.
     """
     now = now_nyc()
     if now.hour < 18:
@@ -665,33 +935,22 @@ def log_actual_today_if_after_6pm_local() -> None:
         return
 
     try:
-        url = (f"https://forecast.weather.gov/product.php"
-               f"?site={_CITY_CFG['cli_site']}&issuedby={_CITY_CFG['cli_issuedby']}"
-               f"&product=CLI&format=CI&version=1&glossary=0")
-        html = requests.get(url, headers=NWS_HEADERS).text
-        pre = BeautifulSoup(html, "html.parser").find("pre")
-        if not pre:
+        html = cli_html if cli_html is not None else _fetch_cli_html(_cli_url())
+        cli_text = _cli_pre_text(html)
+        if cli_text is None:
             print("❌ CLI report not found (v1).")
             return
 
-        sections = _parse_cli_sections(pre.text)
+        sections = _parse_cli_sections(cli_text)
         pair = sections.get("TODAY")
         if not pair:
             print("⚠️ TODAY MAXIMUM not found; skipping.")
             return
 
         temp, time_clean = pair
-        cli_date = today_nyc().isoformat()
-
-        ensure_csv_header()
-        actual_already = False
-        with open(_csv_file(), newline="") as f:
-            for row in csv.DictReader(f):
-                if row.get("forecast_or_actual") == "actual" and row.get("cli_date") == cli_date:
-                    actual_already = True
-                    break
+        cli_date = now.date().isoformat()
 
-        if not actual_already:
+        if not actual_exists_for_date(cli_date):
             _append_row({
                 "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
                 "target_date": cli_date,
@@ -710,48 +969,52 @@ def log_actual_today_if_after_6pm_local() -> None:
     except Exception as e:
         print(f"❌ Error logging today's actual high: {e}")
 
-def upsert_actual_row(cli_date_iso: str, temp: str, time_clean: str) -> None:
+def upsert_actual_row(cli_date_iso: str, temp: str, time_clean: str,
+                      now: Optional[datetime.datetime] = None) -> None:
     """
     Insert or replace an 'actual' row for cli_date_iso (YYYY-MM-DD).
+    A new date is appended; the file is only rewritten to correct a value.
+    `now` is the caller's clock read, if it already has one.
     """
-    rows, fns = _read_all_rows(include_accu=False)
-    now_s = now_nyc().strftime("%Y-%m-%d %H:%M:%S")
+    current = _log_index().actuals.get(cli_date_iso)
+    if current == (temp, time_clean):
+        return  # already up to date — nothing to write
+    now_s = (now or now_nyc()).strftime("%Y-%m-%d %H:%M:%S")
     target_date = cli_date_iso
 
-    updated = False
-    for r in rows:
-        if r.get("forecast_or_actual") == "actual" and r.get("cli_date") == cli_date_iso:
-            if r.get("actual_high") != temp or (r.get("high_time") or "") != time_clean:
-                r["timestamp"]         = now_s
-                r["target_date"]       = target_date
-                r["forecast_or_actual"]= "actual"
-                r["forecast_time"]     = ""
-                r["predicted_high"]    = ""
-                r["forecast_detail"]   = ""
-                r["cli_date"]          = cli_date_iso
-                r["actual_high"]       = temp
-                r["high_time"]         = time_clean
-            updated = True
-            break
-
-    if not updated:
-        rows.append({
-            "timestamp": now_s,
-            "target_date": target_date,
-            "forecast_or_actual": "actual",
-            "forecast_time": "",
-            "predicted_high": "",
-            "forecast_detail": "",
-            "cli_date": cli_date_iso,
-            "actual_high": temp,
-            "high_time": time_clean
-        })
-
-    _write_all_rows(rows, fns)
-
-def upsert_yesterday_actual_if_morning_local() -> None:
+    if current is not None:
+        rows, fns = _read_all_rows(include_accu=False)
+        for r in rows:
+            if r.get("forecast_or_actual") != "actual" or r.get("cli_date") != cli_date_iso:
+                continue
+            r["timestamp"]         = now_s
+            r["target_date"]       = target_date
+            r["forecast_or_actual"]= "actual"
+            r["forecast_time"]     = ""
+            r["predicted_high"]    = ""
+            r["forecast_detail"]   = ""
+            r["cli_date"]          = cli_date_iso
+            r["actual_high"]       = temp
+            r["high_time"]         = time_clean
+            _write_all_rows(rows, fns)
+            return
+
+    _append_row({
+        "timestamp": now_s,
+        "target_date": target_date,
+        "forecast_or_actual": "actual",
+        "forecast_time": "",
+        "predicted_high": "",
+        "forecast_detail": "",
+        "cli_date": cli_date_iso,
+        "actual_high": temp,
+        "high_time": time_clean
+    })
+
+def upsert_yesterday_actual_if_morning_local(cli_html: Optional[str] = None) -> None:
     """
     Between midnight–noon ET, prefer the latest CLI (v1) 'YESTERDAY MAXIMUM'.
+    `cli_html` is an already fetched CLI page; fetched here if omitted.
     """
     now = now_nyc()
     if not (0 <= now.hour < 12):
@@ -759,16 +1022,13 @@ def upsert_yesterday_actual_if_morning_local() -> None:
         return
 
     try:
-        url = (f"https://forecast.weather.gov/product.php"
-               f"?site={_CITY_CFG['cli_site']}&issuedby={_CITY_CFG['cli_issuedby']}"
-               f"&product=CLI&format=CI&version=1&glossary=0")
-        html = requests.get(url, headers=NWS_HEADERS).text
-        pre = BeautifulSoup(html, "html.parser").find("pre")
-        if not pre:
+        html = cli_html if cli_html is not None else _fetch_cli_html(_cli_url())
+        cli_text = _cli_pre_text(html)
+        if cli_text is None:
             print("❌ CLI v1 not available")
             return
 
-        sections = _parse_cli_sections(pre.text)
+        sections = _parse_cli_sections(cli_text)
         yday_pair = sections.get("YESTERDAY")
         if not yday_pair:
             print("⏭️ No YESTERDAY MAXIMUM on v1 yet — will check later.")
@@ -777,7 +1037,7 @@ def upsert_yesterday_actual_if_morning_local() -> None:
         temp, time_clean = yday_pair
         yday_iso = (now.date() - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
 
-        upsert_actual_row(yday_iso, temp, time_clean)
+        upsert_actual_row(yday_iso, temp, time_clean, now)
         print(f"✅ Upserted YESTERDAY actual: {temp}°F at {time_clean} for {yday_iso}")
 
     except Exception as e:
@@ -795,12 +1055,34 @@ def write_today_bcp_snapshot_if_after_6pm() -> None:
 # =========================
 # (Optional) Simple loop mode
 # =========================
+_HOUR_STAMP = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}")
+
 def already_logged(entry_type: str, identifier: str) -> bool:
     """Legacy duplicate check used by local loop mode only."""
-    if not os.path.exists(_csv_file()):
+    if _HOUR_STAMP.fullmatch(identifier):
+        # Loop mode asks for "YYYY-MM-DD HH" every minute; answer that from
+        # the shared log index: a row of that type stamped in that hour.
+        return (entry_type, identifier) in _log_index().logged_hours
+    try:
+        with open(_csv_file(), "r", buffering=READ_BUFFER) as f:
+            return any(identifier in line and entry_type in line for line in f)
+    except FileNotFoundError:
         return False
-    with open(_csv_file(), "r") as f:
-        return any(identifier in line and entry_type in line for line in f)
+
+def _next_occurrence(hhmm: str, now: datetime.datetime) -> datetime.datetime:
+    """Next HH:MM strictly after `now`, in `now`'s timezone (naive = system local)."""
+    h, m = map(int, hhmm.split(":"))
+    at = now.replace(hour=h, minute=m, second=0, microsecond=0)
+    return at if at > now else at + datetime.timedelta(days=1)
+
+def _seconds_to_next_wakeup() -> float:
+    """Seconds until the next FETCH_TIMES slot or actual-gate boundary."""
+    now, local_now = datetime.datetime.now(), now_nyc()
+    nxt = min(
+        [_next_occurrence(s, now).timestamp() for s in FETCH_TIMES_SET]
+        + [_next_occurrence(s, local_now).timestamp() for s in LOOP_GATE_TIMES]
+    )
+    return max(1.0, nxt - time.time())
 
 def main_loop() -> None:
     """
@@ -808,19 +1090,24 @@ def main_loop() -> None:
     """
     print("NWS Auto Logger started. Ctrl+C to stop.")
     ensure_csv_header()
-    while True:
-        n = datetime.datetime.now()
-        n_str = n.strftime("%H:%M")
-        for sched in FETCH_TIMES:
-            if n_str == sched:
+    try:
+        while True:
+            n = datetime.datetime.now()
+            n_str = n.strftime("%H:%M")
+            if n_str in FETCH_TIMES_SET:
                 if not already_logged("forecast", n.strftime("%Y-%m-%d %H")):
                     log_forecast()
                 log_forecast_for_tomorrow()
 
-        log_actual_today_if_after_6pm_local()        # no-op before 6pm ET
-        upsert_yesterday_actual_if_morning_local()   # no-op after noon ET
+            log_actual_today_if_after_6pm_local()        # no-op before 6pm ET
+            upsert_yesterday_actual_if_morning_local()   # no-op after noon ET
 
-        time.sleep(60)
+            # Nothing changes between slots; sleep straight to the next one.
+            time.sleep(_seconds_to_next_wakeup())
+    except KeyboardInterrupt:
+        print("NWS Auto Logger stopped.")
+    finally:
+        _SESSION.close()
 
 # =========================
 # One-shot entrypoint for cron/Actions
@@ -833,6 +1120,20 @@ def run_all_once():
       - Morning upsert runs midnight–noon ET only.
     """
     ensure_csv_header()
+
+    # The forecast and CLI fetches are independent. When a CLI step is due
+    # this run, issue both at once so the run waits on the slower one only;
+    # the steps below then read the warm periods cache / the fetched page.
+    # A failed prefetch is dropped and the step fetches (and reports) itself.
+    cli_html = None
+    hour = now_nyc().hour
+    if hour >= 18 or hour < 12:
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            ex.submit(get_forecast_periods)
+            cli = ex.submit(_fetch_cli_html, _cli_url())
+        if cli.exception() is None:
+            cli_html = cli.result()
+
     try:
         log_forecast()
     except Exception as e:
@@ -842,11 +1143,11 @@ def run_all_once():
     except Exception as e:
         print(f"⚠️ log_forecast_for_tomorrow error: {e}")
     try:
-        log_actual_today_if_after_6pm_local()
+        log_actual_today_if_after_6pm_local(cli_html)
     except Exception as e:
         print(f"⚠️ log_actual_today_if_after_6pm_local error: {e}")
     try:
-        upsert_yesterday_actual_if_morning_local()
+        upsert_yesterday_actual_if_morning_local(cli_html)
     except Exception as e:
         print(f"⚠️ upsert_yesterday_actual_if_morning_local error: {e}")
 
@@ -31,11 +31,23 @@ def load_official_actuals(nws_csv: str) -> dict[str, float]:
     if not p.exists():
         return out
     with p.open() as f:
-        for r in csv.DictReader(f):
-            if r.get("forecast_or_actual") == "actual" and r.get("actual_high"):
-                d = r.get("cli_date") or r.get("target_date")
+        # Positional csv.reader: only 4 of the log's columns matter here, so
+        # skip building a dict per row (this runs over the whole log).
+        reader = csv.reader(f)
+        col = {name: i for i, name in enumerate(next(reader, []))}
+        i_kind, i_high, i_cli, i_target = (
+            col.get(name, -1) for name in ("forecast_or_actual", "actual_high", "cli_date", "target_date")
+        )
+
+        def cell(row: list[str], i: int) -> str | None:
+            return row[i] if 0 <= i < len(row) else None
+
+        for row in reader:
+            high = cell(row, i_high)
+            if cell(row, i_kind) == "actual" and high:
+                d = cell(row, i_cli) or cell(row, i_target)
                 try:
-                    out[str(d)] = float(r["actual_high"])
+                    out[str(d)] = float(high)
                 except (ValueError, TypeError):
                     pass
     return out
@@ -1,6 +1,6 @@
 # prediction_writer.py
 from __future__ import annotations
-import os, json, argparse, pickle, math, time, urllib.request
+import os, json, argparse, pickle, math, re, time, urllib.request
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -15,7 +15,7 @@ from atm_cache import (
 # reuse your existing helpers from nws_auto_logger.py (leave that file alone)
 from nws_auto_logger import (
     now_nyc, today_nyc, _read_all_rows,
-    _compute_avg_bias_excluding, _compute_today_pre_high_mean,
+    _build_bias_index, _compute_avg_bias_excluding, _compute_today_pre_high_mean,
     _float_or_none, compute_today_gate_f,
 )
 from model_config import (
@@ -90,7 +90,6 @@ def _snap_loads(raw) -> dict:
     except Exception:
         # Fall back: sanitize NaN / Infinity tokens and retry.
         try:
-            import re
             cleaned = re.sub(r':\s*NaN\b', ': null', raw)
             cleaned = re.sub(r':\s*-?Infinity\b', ': null', cleaned)
             return json.loads(cleaned)
@@ -518,6 +517,11 @@ def _compute_solar_window_threat(live_atm: dict, live_obs: dict, current_hour: i
 # Kalshi API base URL (public, no auth needed)
 KALSHI_API_BASE = "https://api.elections.kalshi.com/trade-api/v2"
 
+# A single write asks for the same event's market more than once (lock check,
+# then bet signal); reuse a fetch that is under a minute old.
+KALSHI_PROBS_TTL = 60
+_KALSHI_PROBS_CACHE: dict = {}  # event_ticker -> (fetched_at, probs)
+
 # Module-level city key — set by _cli() before write functions run
 _CITY_KEY = "nyc"
 
@@ -2351,6 +2355,10 @@ def _fetch_kalshi_market_probs(target_date_iso: str) -> dict:
         dd = dt.strftime("%d")
         event_ticker = f"{series}-{yy}{mon}{dd}"
 
+        hit = _KALSHI_PROBS_CACHE.get(event_ticker)
+        if hit and time.time() - hit[0] < KALSHI_PROBS_TTL:
+            return dict(hit[1])
+
         url = f"{KALSHI_API_BASE}/markets?event_ticker={event_ticker}"
         req = urllib.request.Request(url, headers={"Accept": "application/json"})
         with urllib.request.urlopen(req, timeout=15) as resp:
@@ -2400,6 +2408,8 @@ def _fetch_kalshi_market_probs(target_date_iso: str) -> dict:
             top = sorted(result.items(), key=lambda x: x[1], reverse=True)[:3]
             for b, p in top:
                 print(f"   {b}: {p:.0%}")
+            # Only real market data is reused; an empty response is re-asked.
+            _KALSHI_PROBS_CACHE[event_ticker] = (time.time(), dict(result))
 
         return result
 
@@ -2423,6 +2433,14 @@ def _parse_kalshi_price(raw) -> Optional[float]:
     return None
 
 
+# Kalshi market-label patterns, compiled once rather than on every label.
+_KALSHI_RANGE_RE = re.compile(r".*?(\d+)°?\s*(?:to|-|–)\s*(\d+)°")
+_KALSHI_OR_MORE_RE = re.compile(r"(\d+)°?\s*or\s*(?:more|above|higher|greater)", re.IGNORECASE)
+_KALSHI_ABOVE_RE = re.compile(r"(?:above|over|higher\s+than|more\s+than)\s*(\d+)°?", re.IGNORECASE)
+_KALSHI_OR_LESS_RE = re.compile(r"(\d+)°?\s*or\s*(?:less|below|lower|fewer)", re.IGNORECASE)
+_KALSHI_BELOW_RE = re.compile(r"(?:below|under|less\s+than|lower\s+than)\s*(\d+)°?", re.IGNORECASE)
+
+
 def _parse_kalshi_bucket(label: str) -> Optional[str]:
     """
     Parse a Kalshi market label into our bucket format.
@@ -2433,27 +2451,26 @@ def _parse_kalshi_bucket(label: str) -> Optional[str]:
       "Below 47°"   → "<=47"
       "Above 70°"   → ">=70"
     """
-    import re
     clean = label.replace("**", "").strip()
 
     # Range: "48° to 49°" or "48-49°"
-    m = re.match(r".*?(\d+)°?\s*(?:to|-|–)\s*(\d+)°", clean)
+    m = _KALSHI_RANGE_RE.match(clean)
     if m:
         return f"{m.group(1)}-{m.group(2)}"
 
     # Upper edge: "70° or more", "70° or above", "Above 70°", "70° or higher"
-    m = re.search(r"(\d+)°?\s*or\s*(?:more|above|higher|greater)", clean, re.IGNORECASE)
+    m = _KALSHI_OR_MORE_RE.search(clean)
     if m:
         return f">={m.group(1)}"
-    m = re.search(r"(?:above|over|higher\s+than|more\s+than)\s*(\d+)°?", clean, re.IGNORECASE)
+    m = _KALSHI_ABOVE_RE.search(clean)
     if m:
         return f">={m.group(1)}"
 
     # Lower edge: "47° or less", "47° or below", "Below 47°", "47° or lower"
-    m = re.search(r"(\d+)°?\s*or\s*(?:less|below|lower|fewer)", clean, re.IGNORECASE)
+    m = _KALSHI_OR_LESS_RE.search(clean)
     if m:
         return f"<={m.group(1)}"
-    m = re.search(r"(?:below|under|less\s+than|lower\s+than)\s*(\d+)°?", clean, re.IGNORECASE)
+    m = _KALSHI_BELOW_RE.search(clean)
     if m:
         return f"<={m.group(1)}"
 
@@ -4156,7 +4173,6 @@ def _c_to_f(c):
     return round(c * 9.0 / 5.0 + 32.0, 1) if c is not None else None
 
 
-import re
 _METAR_6HR_MAX_RE = re.compile(r'\b1([01])(\d{3})\b')
 
 def _parse_metar_6hr_max(raw_message: str) -> float | None:
@@ -7001,8 +7017,9 @@ def write_today_for_today(target_date_iso: Optional[str] = None) -> None:
         target_date_iso = today_nyc().isoformat()
     rows, _ = _read_all_rows(include_accu=True)
 
-    avg_bias_excl_today = _compute_avg_bias_excluding(rows, target_date_iso)
-    today_pre_mean      = _compute_today_pre_high_mean(rows, target_date_iso)
+    bias_index          = _build_bias_index(rows)
+    avg_bias_excl_today = _compute_avg_bias_excluding(rows, target_date_iso, index=bias_index)
+    today_pre_mean      = _compute_today_pre_high_mean(rows, target_date_iso, index=bias_index)
     nws_latest  = _latest_forecast(rows, target_date_iso, source=None)
     accu_latest = _latest_forecast(rows, target_date_iso, source="accu")
 
@@ -15,6 +15,7 @@ from nws_auto_logger import (
     ensure_csv_header,
     log_forecast,
     log_forecast_for_tomorrow,
+    log_both_forecasts,
     log_actual_today_if_after_6pm_local,
     upsert_yesterday_actual_if_morning_local,
     # NEW:
@@ -42,8 +43,7 @@ def main():
         write_today_bcp_snapshot_if_after_6pm()        # optional manual hook
     else:
         # smart_all (default): run everything idempotently
-        log_forecast()
-        log_forecast_for_tomorrow()
+        log_both_forecasts()                           # today + tomorrow, one append
         log_actual_today_if_after_6pm_local()
         upsert_yesterday_actual_if_morning_local()
         write_today_bcp_snapshot_if_after_6pm()
@@ -0,0 +1,104 @@
+"""Golden tests — accuweather_logger dedupe scan and CSV append.
+
+Freezes what the tail-read, backwards-walking scan_log sees and how rows are
+appended, so the AccuWeather I/O path can keep being reworked for speed.
+"""
+import datetime
+import os
+
+import pytest
+
+# The module reads its keys and log path at import, and exits during the
+# midnight-4am local freeze: pin a fixed-offset zone where it is midday now.
+_ENV = {"ACCU_API_KEY": "test", "ACCU_LOCATION_KEY": "0", "ACCU_CSV_PATH": os.devnull,
+        "TZ": f"Etc/GMT{datetime.datetime.now(datetime.timezone.utc).hour - 12:+d}"}
+_saved = {k: os.environ.get(k) for k in _ENV}
+os.environ.update(_ENV)
+import accuweather_logger as al  # noqa: E402
+for _k, _v in _saved.items():
+    if _v is None:
+        os.environ.pop(_k)
+    else:
+        os.environ[_k] = _v
+
+WANTED = {"2026-07-15", "2026-07-16"}
+
+
+def _row(target, high, kind="forecast", source="AccuWeather"):
+    return f"2026-07-15 06:00:00,{target},{kind},,{high},Sunny,,,,,{source}\n"
+
+
+@pytest.fixture
+def accu_csv(tmp_path):
+    path = tmp_path / "accuweather_log.csv"
+    path.write_text(",".join(al.LOG_HEADER) + "\n")
+    return path
+
+
+class TestScanLog:
+    def test_today_and_tomorrow(self, accu_csv):
+        with open(accu_csv, "a") as f:
+            f.write(_row("2026-07-15", 84) + _row("2026-07-16", 83) + _row("2026-07-15", 86)
+                    + _row("2026-07-15", 90, source="NWS") + _row("2026-07-16", "", kind="actual"))
+        info = al.scan_log(str(accu_csv), WANTED)
+        assert info["2026-07-15"] == {"actual": False, "highs": {84, 86}, "last": 86}
+        assert info["2026-07-16"] == {"actual": True, "highs": {83}, "last": 83}
+
+    def test_missing_and_empty_files(self, tmp_path, accu_csv):
+        empty = {"actual": False, "highs": set(), "last": None}
+        assert al.scan_log(str(tmp_path / "missing.csv"), WANTED) == {d: empty for d in WANTED}
+        accu_csv.write_text("")
+        assert al.scan_log(str(accu_csv), WANTED) == {d: empty for d in WANTED}
+
+    def test_only_the_tail_is_read(self, accu_csv):
+        # Reordered header: columns must still come from the file's first line.
+        header = ["source"] + [c for c in al.LOG_HEADER if c != "source"]
+        filler = "AccuWeather,2026-07-15 06:00:00,2026-07-14,forecast,,70,Sunny,,,,\n"
+        with open(accu_csv, "w") as f:
+            f.write(",".join(header) + "\n")
+            f.write("AccuWeather,2026-07-15 06:00:00,2026-07-16,forecast,,99,Sunny,,,,\n")
+            f.write(filler * (al.TAIL_BYTES // len(filler) + 1))
+            f.write("AccuWeather,2026-07-15 06:00:00,2026-07-16,forecast,,83,Sunny,,,,\n")
+        assert os.path.getsize(accu_csv) > al.TAIL_BYTES
+        assert al.scan_log(str(accu_csv), WANTED)["2026-07-16"]["highs"] == {83}
+
+    def test_stops_two_days_before_earliest_date(self, accu_csv):
+        with open(accu_csv, "a") as f:
+            f.write(_row("2026-07-15", 84) + _row("2026-07-13", 80) + _row("2026-07-16", 83))
+        info = al.scan_log(str(accu_csv), WANTED)
+        assert info["2026-07-16"]["highs"] == {83}
+        assert info["2026-07-15"]["highs"] == set()  # behind the 07-13 row
+
+
+class TestAppendRows:
+    ROW = al.row_for(84, "Sunny", "2026-07-15", "2026-07-15 06:00:00")
+
+    def test_empty_file_gets_header(self, accu_csv):
+        accu_csv.write_text("")
+        al.append_rows(str(accu_csv), [self.ROW])
+        lines = accu_csv.read_text().splitlines()
+        assert lines[0] == ",".join(al.LOG_HEADER)
+        assert lines[1] == "2026-07-15 06:00:00,2026-07-15,forecast,2026-07-15 06:00:00,84,Sunny,,,,,AccuWeather"
+
+    def test_missing_file_created_with_header(self, tmp_path):
+        path = tmp_path / "new.csv"
+        al.append_rows(str(path), [self.ROW])
+        assert path.read_text().splitlines()[0] == ",".join(al.LOG_HEADER)
+
+    def test_existing_file_only_appends(self, accu_csv):
+        before = accu_csv.read_text()
+        al.append_rows(str(accu_csv), [self.ROW, self.ROW])
+        al.append_rows(str(accu_csv), [])
+        after = accu_csv.read_text()
+        assert after.startswith(before)
+        assert after.count(",".join(al.LOG_HEADER)) == 1
+        assert after.count("\n") == 3
+
+
+class TestToIntTemp:
+    @pytest.mark.parametrize("v, expected", [
+        (84, 84), (84.4, 84), (84.5, 84), (85.5, 86), (-0.5, 0),
+        ("84.5", 84), ("85.5", 86), ("83", 83), (None, ""), ("n/a", ""),
+    ])
+    def test_half_to_even(self, v, expected):
+        assert al._to_int_temp(v) == expected
@@ -0,0 +1,150 @@
+"""Golden tests — the Flask /api/predict-ml serving path (api.py).
+
+temp_model.pkl / bucket_model.pkl are retrained and recommitted nightly, so
+nothing here pins model outputs. Instead the endpoint is checked against the
+original pandas DataFrame -> TEMP_MODEL.predict() path on whatever model is
+loaded, so serving-side performance work (batching, feature packing,
+serialization) cannot move a prediction.
+"""
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("flask")
+
+import api  # noqa: E402  (needs flask)
+from model_config import ACCU_NWS_FALLBACK, derive_bucket_probabilities  # noqa: E402
+
+SUMMER = {
+    "nws_first": 80, "nws_last": 82, "nws_max": 83, "nws_min": 79,
+    "nws_mean": 81, "nws_count": 4, "accu_last": 84, "accu_mean": 83.5,
+    "month": 7, "target_date": "2026-07-15", "rolling_bias_7d": 0.5,
+}
+# No AccuWeather at all: exercises the accu→NWS fallback fill.
+WINTER_NWS_ONLY = {"nws_last": 60, "nws_mean": 59, "month": 1, "target_date": "2026-01-10"}
+
+
+@pytest.fixture
+def client():
+    return api.app.test_client()
+
+
+def _reference_frame(raw):
+    """The pre-numpy prepare_features(): a one-row DataFrame in MODEL_COLS order."""
+    m = int(raw.get("month", 1))
+    doy = datetime.strptime(raw["target_date"], "%Y-%m-%d").timetuple().tm_yday
+    row = {c: float(raw.get(c, np.nan)) for c in ("nws_first", "nws_last", "nws_max", "nws_min", "nws_mean")}
+    row.update({c: float(raw[c]) if raw.get(c) is not None else np.nan
+                for c in ("accu_first", "accu_last", "accu_max", "accu_min", "accu_mean")})
+    row.update({c: float(raw.get(c, 0)) for c in (
+        "nws_spread", "nws_std", "nws_trend", "forecast_velocity", "forecast_acceleration",
+        "accu_spread", "accu_std", "accu_trend", "nws_accu_spread", "nws_accu_mean_diff",
+        "rolling_bias_7d", "rolling_bias_21d", "rolling_ml_error_7d")})
+    row.update({
+        "nws_count": int(raw.get("nws_count", 1)),
+        "accu_count": int(raw.get("accu_count", 0)),
+        "day_of_year_sin": np.sin(2 * np.pi * doy / 365),
+        "day_of_year_cos": np.cos(2 * np.pi * doy / 365),
+        "month": m,
+        "is_summer": int(m in [6, 7, 8]),
+        "is_winter": int(m in [12, 1, 2]),
+        "has_accu_data": int(raw.get("has_accu_data", int(raw.get("accu_last") is not None))),
+    })
+    for col in api.MODEL_COLS:
+        row.setdefault(col, np.nan)
+    X = pd.DataFrame([row], columns=api.MODEL_COLS)
+    for accu_col, nws_col in ACCU_NWS_FALLBACK.items():
+        if accu_col in X and nws_col in X and pd.isna(X.loc[0, accu_col]):
+            X.loc[0, accu_col] = X.loc[0, nws_col]
+    return X
+
+
+def _reference_response(raw):
+    """What the endpoint returned before the serving rework, for the loaded model."""
+    temp = float(api.TEMP_MODEL.predict(_reference_frame(raw))[0])
+    temp += float(raw["accu_last"] if raw.get("accu_last") is not None
+                  else raw.get("nws_last", raw.get("nws_mean", 0)))
+    buckets = derive_bucket_probabilities(temp, api.RESIDUAL_STD)
+    best = max(buckets, key=buckets.get)
+    probs = sorted(({"bucket": b, "p": p} for b, p in buckets.items()),
+                   key=lambda d: d["p"], reverse=True)[:5]
+    return {
+        "temperature": round(temp, 2),
+        "residual_std": round(api.RESIDUAL_STD, 2),
+        "best_bucket": best,
+        "confidence": round(buckets[best], 4),
+        "bucket_probabilities": buckets,
+        "probs": probs,
+        "should_bet": buckets[best] >= 0.15,
+    }
+
+
+def _post(client, payload):
+    r = client.post("/api/predict-ml", json=payload)
+    assert r.status_code == 200
+    return r.get_json()
+
+
+class TestPredictMl:
+    @pytest.mark.filterwarnings("ignore:X does not have valid feature names")
+    @pytest.mark.parametrize("payload", [SUMMER, WINTER_NWS_ONLY], ids=["summer_with_accu", "winter_nws_only"])
+    def test_matches_dataframe_path(self, client, payload):
+        d = _post(client, payload)
+        assert d.pop("generated_at").endswith("Z")
+        assert d == _reference_response(payload)
+
+    def test_probs_sorted_and_capped(self, client):
+        probs = _post(client, SUMMER)["probs"]
+        assert len(probs) == 5
+        assert [p["p"] for p in probs] == sorted((p["p"] for p in probs), reverse=True)
+
+    def test_bad_payload_is_400(self, client):
+        r = client.post("/api/predict-ml", json={"month": "not-a-month"})
+        assert r.status_code == 400
+        assert "error" in r.get_json()
+
+    def test_bare_nan_body_still_accepted(self, client):
+        body = '{"nws_first": NaN, "nws_last": 82, "month": 7, "target_date": "2026-07-15"}'
+        r = client.post("/api/predict-ml", data=body, content_type="application/json")
+        assert r.status_code == 200
+
+    def test_response_keys_sorted(self, client):
+        r = client.post("/api/predict-ml", json=SUMMER)
+        keys = list(r.get_json().keys())
+        assert keys == sorted(keys)
+        assert r.data.endswith(b"\n")
+
+
+class TestBatchedInference:
+    def test_concurrent_requests_match_serial(self):
+        payloads = [SUMMER, WINTER_NWS_ONLY] * 8
+        expected = [_post(api.app.test_client(), p)["temperature"] for p in payloads]
+
+        got = [None] * len(payloads)
+
+        def worker(i):
+            got[i] = _post(api.app.test_client(), payloads[i])["temperature"]
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(payloads))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert got == expected
+
+
+class TestFlatForest:
+    @pytest.mark.filterwarnings("ignore:X does not have valid feature names")
+    def test_bit_identical_to_sklearn(self):
+        flat = api.FlatForest(api.TEMP_MODEL)
+        rng = np.random.default_rng(42)
+        X = rng.normal(60, 25, (500, api.TEMP_MODEL.n_features_in_))
+        X[rng.random(X.shape) < 0.3] = np.nan
+        assert np.array_equal(flat.predict(X), api.TEMP_MODEL.predict(X))
+
+    def test_unsupported_model_falls_back(self):
+        with pytest.warns(RuntimeWarning, match="FlatForest disabled"):
+            assert api.FlatForest.from_model(object()) is None
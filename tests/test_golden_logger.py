@@ -0,0 +1,335 @@
+"""Golden tests — nws_auto_logger CLI / CSV helpers.
+
+Freezes how the logger reads the NWS CLI product and its own CSV before the
+I/O and parsing paths are reworked for speed.
+"""
+import datetime
+import os
+
+import pytest
+
+import nws_auto_logger as nal
+
+CLI_TEXT = """
+000
+CDUS41 KOKX 151730
+CLINYC
+
+CLIMATE REPORT
+NATIONAL WEATHER SERVICE NEW YORK, NY
+
+WEATHER ITEM   OBSERVED TIME   RECORD YEAR NORMAL DEPARTURE LAST
+                VALUE   (LST)  VALUE       VALUE  FROM      YEAR
+TEMPERATURE (F)
+ TODAY
+  MAXIMUM         84R   154 PM  83    1998  78      6       80
+  MINIMUM         70    559 AM  55    1960  63      7       66
+ YESTERDAY
+  MAXIMUM         79   1226 PM  95    1953  78      1       81
+"""
+
+CLI_PAGE = (
+    "<html><head><title>CLI</title></head><body>"
+    "<div id='nav'><a href='/'>Home</a><p>menu</p></div>"
+    f"<pre class='glossaryProduct'>{CLI_TEXT}</pre>"
+    "<pre>second block</pre>"
+    "</body></html>"
+)
+
+
+class TestCliPreText:
+    def test_first_pre_only(self):
+        assert nal._cli_pre_text(CLI_PAGE) == CLI_TEXT
+
+    def test_inline_markup_and_entities(self):
+        page = "<PRE class='x'>MAX &amp; MIN\n<b>84</b> &lt;R&gt;</PRE>"
+        assert nal._cli_pre_text(page) == "MAX & MIN\n84 <R>"
+
+    def test_no_pre(self):
+        assert nal._cli_pre_text("<html><body><p>down</p></body></html>") is None
+
+
+class _StreamedPage:
+    def __init__(self, body, encoding="utf-8"):
+        self.body, self.encoding, self.read = body.encode(), encoding, 0
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            self.read = i + chunk_size
+            yield self.body[i:i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class TestFetchCliHtml:
+    def test_stops_after_first_pre(self, monkeypatch):
+        page = _StreamedPage(CLI_PAGE + "<footer>" + "x" * 5000 + "</footer>")
+        monkeypatch.setattr(nal._SESSION, "get", lambda url, **kw: page)
+        html = nal._fetch_cli_html("https://example.invalid", chunk_size=64)
+        assert nal._cli_pre_text(html) == CLI_TEXT
+        assert page.read < len(CLI_PAGE) + 64
+
+    def test_no_pre_reads_everything(self, monkeypatch):
+        body = "<html><body><p>down</p></body></html>"
+        monkeypatch.setattr(nal._SESSION, "get", lambda url, **kw: _StreamedPage(body, None))
+        assert nal._fetch_cli_html("https://example.invalid", chunk_size=7) == body
+
+
+class TestParseCliSections:
+    def test_today_and_yesterday(self):
+        s = nal._parse_cli_sections(CLI_TEXT)
+        assert s["TODAY"] == ("84", nal._normalize_cli_time("154", "PM"))
+        assert s["YESTERDAY"] == ("79", nal._normalize_cli_time("1226", "PM"))
+
+    def test_missing_sections(self):
+        assert nal._parse_cli_sections("nothing here") == {"TODAY": None, "YESTERDAY": None}
+
+    def test_first_maximum_wins(self):
+        text = "TODAY\n MAXIMUM 84 154 PM\n MAXIMUM 99 300 PM\n"
+        assert nal._parse_cli_sections(text)["TODAY"][0] == "84"
+
+
+@pytest.fixture
+def nws_csv(tmp_path, monkeypatch):
+    path = tmp_path / "nws_forecast_log.csv"
+    monkeypatch.setattr(nal, "_CITY_CFG", {**nal._CITY_CFG, "nws_csv": str(path)})
+    path.write_text(
+        "timestamp,target_date,forecast_or_actual,forecast_time,predicted_high,"
+        "forecast_detail,cli_date,actual_high,high_time,bias_corrected_prediction,source\n"
+        "2026-07-14 06:00:00,2026-07-14,forecast,2026-07-14 06:00:00,85,Sunny,,,,,\n"
+        "2026-07-15 07:00:00,2026-07-14,actual,,,,2026-07-14,86,2:10 PM,,\n"
+        "2026-07-15 06:00:00,2026-07-15,forecast,2026-07-15 06:00:00,84,Sunny,,,,,\n"
+    )
+    return path
+
+
+class TestUpsertActualRow:
+    def _actuals(self):
+        rows, _ = nal._read_all_rows()
+        return [(r["cli_date"], r["actual_high"], r["high_time"])
+                for r in rows if r["forecast_or_actual"] == "actual"]
+
+    def test_new_date_appended(self, nws_csv):
+        before = nws_csv.read_text()
+        nal.upsert_actual_row("2026-07-15", "88", "3:05 PM")
+        after = nws_csv.read_text()
+        assert after.startswith(before)
+        assert after[len(before):].startswith("2026-")
+        assert after.rstrip("\n").endswith(",actual,,,,2026-07-15,88,3:05 PM,,")
+
+    def test_missing_file_gets_header(self, nws_csv):
+        nws_csv.unlink()
+        nal.upsert_actual_row("2026-07-15", "88", "3:05 PM")
+        lines = nws_csv.read_text().splitlines()
+        assert lines[0] == ",".join(nal.BASE_HEADER)
+        assert lines[1].endswith(",actual,,,,2026-07-15,88,3:05 PM")
+
+    def test_unchanged_is_noop(self, nws_csv):
+        before = nws_csv.read_text()
+        nal.upsert_actual_row("2026-07-14", "86", "2:10 PM")
+        assert nws_csv.read_text() == before
+
+    def test_changed_value_replaced_in_place(self, nws_csv):
+        nal.upsert_actual_row("2026-07-14", "87", "2:40 PM")
+        assert self._actuals() == [("2026-07-14", "87", "2:40 PM")]
+        assert len(nal._read_all_rows()[0]) == 3
+
+
+class TestReadAllRows:
+    def test_rows_are_fresh_copies(self, nws_csv):
+        rows, fns = nal._read_all_rows()
+        rows[0]["predicted_high"] = "99"
+        fns.append("junk")
+        again, fns2 = nal._read_all_rows()
+        assert again[0]["predicted_high"] == "85"
+        assert "junk" not in fns2
+
+    def test_sees_appended_rows(self, nws_csv):
+        assert len(nal._read_all_rows()[0]) == 3
+        nal._append_row({"forecast_or_actual": "forecast", "target_date": "2026-07-16"})
+        assert len(nal._read_all_rows()[0]) == 4
+
+    def test_sees_same_size_replace(self, nws_csv):
+        assert nal._read_all_rows()[0][0]["predicted_high"] == "85"
+        st = nws_csv.stat()
+        tmp = nws_csv.with_suffix(".tmp")
+        tmp.write_text(nws_csv.read_text().replace(",85,", ",75,"))
+        os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp, nws_csv)
+        assert nal._read_all_rows()[0][0]["predicted_high"] == "75"
+
+
+class TestAppendRows:
+    def test_batch_matches_single_appends(self, nws_csv, tmp_path):
+        rows = [{"target_date": "2026-07-15", "forecast_or_actual": "forecast", "predicted_high": "85"},
+                {"target_date": "2026-07-16", "forecast_or_actual": "forecast", "predicted_high": "83",
+                 "not_a_column": "x"}]
+        nal._append_rows(rows)
+        batched = nws_csv.read_text()
+
+        nws_csv.write_text(batched.split("\n", 1)[0] + "\n")
+        nal._append_rows([])
+        for row in rows:
+            nal._append_row(row)
+        assert batched.endswith(nws_csv.read_text().split("\n", 1)[1])
+        assert batched.count("\n") == 6
+
+
+class TestAlreadyLogged:
+    def test_hour_stamp(self, nws_csv):
+        assert nal.already_logged("forecast", "2026-07-15 06")
+        assert not nal.already_logged("forecast", "2026-07-15 08")
+        # the 07:00 line is an actual row, not a forecast
+        assert not nal.already_logged("forecast", "2026-07-15 07")
+        assert nal.already_logged("actual", "2026-07-15 07")
+        assert not nal.already_logged("actual", "2026-07-15 06")
+
+    def test_sees_appended_rows(self, nws_csv):
+        assert not nal.already_logged("forecast", "2026-07-16 05")
+        with open(nws_csv, "a") as f:
+            f.write("2026-07-16 05:00:00,2026-07-16,forecast,2026-07-16 05:00:00,83,Sunny,,,,,\n")
+        assert nal.already_logged("forecast", "2026-07-16 05")
+
+    def test_other_identifiers_substring(self, nws_csv):
+        assert nal.already_logged("forecast", "Sunny")
+        assert not nal.already_logged("forecast", "Rain")
+
+
+class TestDedupeChecks:
+    def test_forecast_changed_since_last(self, nws_csv):
+        assert not nal.forecast_changed_since_last("2026-07-15", "84")
+        assert nal.forecast_changed_since_last("2026-07-15", "85")
+        assert nal.forecast_changed_since_last("2026-07-16", "84")
+
+    def test_actual_exists(self, nws_csv):
+        assert nal.actual_exists_for_date("2026-07-14")
+        assert not nal.actual_exists_for_date("2026-07-15")
+
+    def test_sees_appended_rows(self, nws_csv):
+        assert not nal.actual_exists_for_date("2026-07-15")
+        nal.upsert_actual_row("2026-07-15", "88", "3:05 PM")
+        assert nal.actual_exists_for_date("2026-07-15")
+        nal._append_row({"forecast_or_actual": "forecast", "target_date": "2026-07-15",
+                         "predicted_high": "86"})
+        assert nal._get_last_forecast_row_for_date("2026-07-15")["predicted_high"] == "86"
+
+    def test_sees_same_size_replace(self, nws_csv):
+        assert not nal.forecast_changed_since_last("2026-07-15", "84")
+        st = nws_csv.stat()
+        tmp = nws_csv.with_suffix(".tmp")
+        tmp.write_text(nws_csv.read_text().replace(",84,", ",74,"))
+        os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp, nws_csv)
+        assert nal.forecast_changed_since_last("2026-07-15", "84")
+
+
+class TestLoopSchedule:
+    def test_next_occurrence(self):
+        at = datetime.datetime(2026, 7, 15, 5, 0)
+        assert nal._next_occurrence("05:00", at) == datetime.datetime(2026, 7, 16, 5, 0)
+        assert nal._next_occurrence("10:50", at) == datetime.datetime(2026, 7, 15, 10, 50)
+
+    def test_wakeup_within_a_day(self):
+        assert 1.0 <= nal._seconds_to_next_wakeup() <= 24 * 3600
+
+
+class TestMinutesFromHhmmAmpm:
+    @pytest.mark.parametrize("s,expected", [
+        ("3:47", 227), ("15:47", 947), (" 3:47 PM ", 947), ("12:05 am", 5),
+        ("12:05 PM", 725), ("3:47PM", None), ("24:00", None), ("3:60", None),
+        ("347 PM", None), ("", None), (None, None), ("MISSING", None),
+    ])
+    def test_parses(self, s, expected):
+        assert nal._minutes_from_hhmm_ampm(s) == expected
+
+
+BIAS_ROWS = [
+    {"forecast_or_actual": "forecast", "target_date": "2026-07-14", "forecast_time": "2026-07-14 06:00:00", "predicted_high": "84"},
+    {"forecast_or_actual": "forecast", "target_date": "2026-07-14", "forecast_time": "2026-07-14 16:00:00", "predicted_high": "90"},  # after the high
+    {"forecast_or_actual": "actual", "cli_date": "2026-07-14", "actual_high": "86", "high_time": "2:10 PM"},
+    {"forecast_or_actual": "forecast", "target_date": "2026-07-15", "forecast_time": "2026-07-15 06:00:00", "predicted_high": "80"},
+    {"forecast_or_actual": "forecast", "target_date": "2026-07-15", "forecast_time": "2026-07-15 09:00:00", "predicted_high": "82"},
+    {"forecast_or_actual": "actual", "cli_date": "2026-07-15", "actual_high": "80", "high_time": ""},
+    {"forecast_or_actual": "forecast", "target_date": "2026-07-16", "forecast_time": "2026-07-16 06:00:00", "predicted_high": "88"},
+]
+
+
+class TestBiasAggregators:
+    def test_values(self):
+        assert nal._build_bias_index(BIAS_ROWS) == {"2026-07-14": (86.0, 84.0), "2026-07-15": (80.0, 81.0)}
+        assert nal._compute_avg_bias_and_today_mean(BIAS_ROWS, "2026-07-14") == (0.5, 84.0)
+        assert nal._compute_avg_bias_excluding(BIAS_ROWS, "2026-07-14") == -1.0
+        assert nal._compute_today_pre_high_mean(BIAS_ROWS, "2026-07-15") == 81.0
+        assert nal._compute_today_pre_high_mean(BIAS_ROWS, "2026-07-16") is None
+
+    def test_prebuilt_index_matches(self):
+        idx = nal._build_bias_index(BIAS_ROWS)
+        for d in ("2026-07-14", "2026-07-15", "2026-07-16"):
+            assert nal._compute_avg_bias_excluding(BIAS_ROWS, d, 7, index=idx) == \
+                nal._compute_avg_bias_excluding(BIAS_ROWS, d, 7)
+            assert nal._compute_today_pre_high_mean(BIAS_ROWS, d, index=idx) == \
+                nal._compute_today_pre_high_mean(BIAS_ROWS, d)
+
+
+class TestPrefetchedCliPage:
+    def test_morning_upsert_uses_given_page(self, nws_csv, monkeypatch):
+        morning = datetime.datetime(2026, 7, 15, 8, 0, tzinfo=nal._tz())
+        monkeypatch.setattr(nal, "now_nyc", lambda: morning)
+
+        def no_fetch(url, **kw):
+            raise AssertionError("page was already fetched")
+        monkeypatch.setattr(nal, "_fetch_cli_html", no_fetch)
+
+        nal.upsert_yesterday_actual_if_morning_local(CLI_PAGE)
+        high, when = nal._log_index().actuals["2026-07-14"]
+        assert (high, when) == ("79", nal._normalize_cli_time("1226", "PM"))
+
+
+class TestLogBothForecasts:
+    ROWS = [{"timestamp": "2026-07-15 06:00:00", "target_date": "2026-07-15",
+             "forecast_or_actual": "forecast", "predicted_high": "84"},
+            {"timestamp": "2026-07-15 06:00:00", "target_date": "2026-07-16",
+             "forecast_or_actual": "forecast", "predicted_high": "83"}]
+
+    def _builders(self, monkeypatch):
+        monkeypatch.setattr(nal, "_today_forecast_row", lambda: dict(self.ROWS[0]))
+        monkeypatch.setattr(nal, "_tomorrow_forecast_row", lambda: dict(self.ROWS[1]))
+
+    def test_reports_after_write(self, nws_csv, monkeypatch, capsys):
+        self._builders(monkeypatch)
+        nal.log_both_forecasts()
+        out = capsys.readouterr().out
+        assert "✅ Logged forecast for today: 84°F" in out
+        assert "✅ Logged forecast for 2026-07-16: 83°F" in out
+
+    def test_failed_write_reports_nothing(self, nws_csv, monkeypatch, capsys):
+        self._builders(monkeypatch)
+
+        def fail(rows):
+            raise OSError("disk full")
+        monkeypatch.setattr(nal, "_append_rows", fail)
+        with pytest.raises(OSError):
+            nal.log_both_forecasts()
+        assert "Logged forecast" not in capsys.readouterr().out
+
+
+class TestForecastUrlCache:
+    def test_retry_error_forgets_cached_url(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(nal, "_FORECAST_URL_FILE", str(tmp_path / "urls.json"))
+        monkeypatch.setattr(nal, "_FORECAST_URL_CACHE", {})
+        monkeypatch.setattr(nal, "_PERIODS_CACHE", {})
+        endpoint = nal._nws_endpoint()
+        nal._FORECAST_URL_CACHE[endpoint] = (nal.time.time(), "https://stale.example/forecast")
+        nal._store_forecast_url_file(endpoint, nal._FORECAST_URL_CACHE[endpoint])
+
+        def exhausted(url, **kw):
+            raise nal.requests.exceptions.RetryError("max retries exceeded")
+        monkeypatch.setattr(nal._SESSION, "get", exhausted)
+        with pytest.raises(nal.requests.exceptions.RetryError):
+            nal.get_forecast_periods()
+        assert endpoint not in nal._FORECAST_URL_CACHE
+        assert endpoint not in nal._load_forecast_url_file()
@@ -0,0 +1,28 @@
+"""Golden tests — nwslogger.data.truth (the one actuals API).
+
+Freezes which logged rows count as official actuals, so changes to how the
+forecast log is scanned can't quietly move the ground truth.
+"""
+from nwslogger.data.truth import load_official_actuals
+
+LOG = (
+    "timestamp,target_date,forecast_or_actual,forecast_time,predicted_high,"
+    "forecast_detail,cli_date,actual_high,high_time,bias_corrected_prediction,source\n"
+    "2026-07-14 06:00:00,2026-07-14,forecast,2026-07-14 06:00:00,85,Sunny,,,,,\n"
+    "2026-07-15 07:00:00,2026-07-14,actual,,,,2026-07-14,86,2:10 PM,,\n"
+    "2026-07-16 07:00:00,2026-07-15,actual,,,,,88,3:05 PM,,\n"      # no cli_date: falls back to target_date
+    "2026-07-17 07:00:00,2026-07-16,actual,,,,2026-07-16,,,,\n"     # blank high: skipped
+    "2026-07-18 07:00:00,2026-07-17,actual,,,,2026-07-17,M,,,\n"    # non-numeric: skipped
+    "2026-07-18 08:00:00,2026-07-17,actual\n"                        # short row: skipped
+    "\n"
+)
+
+
+def test_load_official_actuals(tmp_path):
+    path = tmp_path / "nws_forecast_log.csv"
+    path.write_text(LOG)
+    assert load_official_actuals(str(path)) == {"2026-07-14": 86.0, "2026-07-15": 88.0}
+
+
+def test_missing_file(tmp_path):
+    assert load_official_actuals(str(tmp_path / "nope.csv")) == {}